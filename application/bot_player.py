@@ -0,0 +1,172 @@
+"""Move selection for computer players.
+
+A move is (card id, wild color or None) to play a card, or None to draw.
+heuristic_move() answers instantly. search_move() tries every sensible
+move against many random guesses of the hidden cards and plays each guess
+out with the heuristic, until the time budget runs out. It only uses the
+GameLogic rules, so it runs unchanged in a worker process. Every guess
+starts from the same GameState and shares all of it but the reshuffled
+hands and draw pile.
+"""
+import random
+import time
+from typing import List, Optional, Tuple
+
+from application.cards import CARD_COLORS, CARD_FACES, CARD_KINDS, COLORS, WILD, iter_mask
+from application.deck import Deck, shuffle
+from application.game_logic import GameLogic
+from application.state_codec import decode_state, encode_rng_state
+
+Move = Optional[Tuple[int, Optional[str]]]
+
+MAX_BOT_ID = 1 << 16  # Discordi id-d on palju suuremad, väikesed id-d on bottidel
+ACTION_FACES = ("Skip", "Reverse", "Draw Two", "Wild Draw Four", "Wild Draw Eight")
+
+
+def is_bot_id(player_id: int) -> bool:
+    return 0 < player_id < MAX_BOT_ID
+
+
+def get_color_counts(hand) -> dict:
+    counts = dict.fromkeys(COLORS, 0)
+    for card_id in hand:
+        color = CARD_COLORS[card_id]
+        if color != WILD:
+            counts[color] += 1
+    return counts
+
+
+def choose_wild_color(hand) -> str:
+    counts = get_color_counts(hand)
+    return max(COLORS, key=counts.__getitem__)
+
+
+def score_card(card_id: int, hand_size: int, next_hand_size: int, color_counts: dict) -> float:
+    color = CARD_COLORS[card_id]
+    face = CARD_FACES[card_id]
+
+    if color == WILD:
+        # Wild kaardid hoitakse lõpuks, kui neid just kohe vaja pole
+        score = 5.0 if hand_size <= 2 else -1.0
+    else:
+        score = float(color_counts[color])
+        if face.isdigit():
+            score += int(face) / 10
+
+    if face in ACTION_FACES:
+        score += 4.0 if next_hand_size <= 2 else 1.0
+    return score
+
+
+def get_candidate_moves(game_logic: GameLogic, player_id: int) -> List[Move]:
+    """Legal moves worth considering, best first by the heuristic. Identical cards are tried once."""
+    player = game_logic.get_player(player_id)
+    hand_size = len(player.hand)
+    next_hand_size = len(game_logic.get_next_player().hand)
+    color_counts = get_color_counts(player.hand)
+
+    scored = {}
+    for card_id in iter_mask(game_logic.get_playable_mask(player)):
+        kind = CARD_KINDS[card_id]
+        if kind not in scored:
+            scored[kind] = (score_card(card_id, hand_size, next_hand_size, color_counts), card_id)
+    if not scored:
+        return [None]
+
+    wild_color = choose_wild_color(player.hand)
+    moves = sorted(scored.values(), reverse=True)
+    return [(card_id, wild_color if CARD_COLORS[card_id] == WILD else None) for _, card_id in moves]
+
+
+def heuristic_move(game_logic: GameLogic, player_id: int) -> Move:
+    return get_candidate_moves(game_logic, player_id)[0]
+
+
+def apply_move(game_logic: GameLogic, player_id: int, move: Move) -> dict:
+    if move is None:
+        return game_logic.draw_card(player_id)
+
+    card_id, color = move
+    if len(game_logic.get_player(player_id).hand) == 2:
+        game_logic.say_uno(player_id)
+    result = game_logic.play_card(player_id, card_id)
+    if "error" not in result and color is not None:
+        result = game_logic.change_wild_card_color(card_id, color)
+    return result
+
+
+def determinize(game_logic: GameLogic, player_id: int, rng: random.Random) -> GameLogic:
+    """Copy of the game where the cards `player_id` cannot see are dealt at random."""
+    state = game_logic.game_state
+
+    # Teiste mängijate käed ja pakk segatakse kokku ja jagatakse samade suurustega uuesti
+    unseen = state.deck.get_draw_pile()
+    for player in state.players:
+        if player.id != player_id:
+            unseen.extend(player.hand)
+    shuffle(unseen, rng)
+
+    players = []
+    offset = 0
+    for player in state.players:
+        if player.id != player_id:
+            hand_size = len(player.hand)
+            player = player.set_hand(unseen[offset:offset + hand_size])
+            offset += hand_size
+        players.append(player)
+
+    # Kasutatud kaartide ahel jääb algse olekuga ühiseks
+    deck = Deck(unseen[offset:].tobytes(), None, state.deck.discards, state.deck.discard_size)
+    clone = GameLogic()
+    clone.game_state = state.replace(players=tuple(players), deck=deck,
+                                     rng=encode_rng_state(random.Random(rng.getrandbits(64)).getstate()),
+                                     bulk_rng=None)
+    return clone
+
+
+def rollout(game_logic: GameLogic, player_id: int, max_turns: int) -> float:
+    """Plays the game out with the heuristic for everyone. 1.0 is a win for `player_id`."""
+    for _ in range(max_turns):
+        current_id = game_logic.get_current_player().id
+        apply_move(game_logic, current_id, heuristic_move(game_logic, current_id))
+        if game_logic.is_winner(current_id):
+            return 1.0 if current_id == player_id else 0.0
+
+    # Pooleli jäänud mäng: mida vähem kaarte võrreldes teistega, seda parem
+    hand_sizes = [len(player.hand) for player in game_logic.get_players()]
+    return 0.5 * (1 - len(game_logic.get_player(player_id).hand) / max(1, sum(hand_sizes)))
+
+
+def search_move(game_logic: GameLogic, player_id: int, time_budget: float, rng: Optional[random.Random] = None,
+                max_turns: int = 300) -> Move:
+    rng = rng or random.Random()
+    candidates = get_candidate_moves(game_logic, player_id)
+    if len(candidates) == 1:
+        return candidates[0]
+
+    deadline = time.monotonic() + time_budget
+    totals = [0.0] * len(candidates)
+    counts = [0] * len(candidates)
+    index = 0
+    # Iga käiku proovitakse vähemalt korra, siis ringiratast kuni aeg saab otsa
+    while index < len(candidates) or time.monotonic() < deadline:
+        move_index = index % len(candidates)
+        clone = determinize(game_logic, player_id, rng)
+        apply_move(clone, player_id, candidates[move_index])
+        if clone.is_winner(player_id):
+            totals[move_index] += 1.0
+        else:
+            totals[move_index] += rollout(clone, player_id, max_turns)
+        counts[move_index] += 1
+        index += 1
+
+    # Võrdsete tulemuste korral jääb heuristika järjekord
+    best = max(range(len(candidates)), key=lambda i: (totals[i] / counts[i], -i))
+    return candidates[best]
+
+
+def search_move_from_state(state: bytes, player_id: int, time_budget: float, seed: int) -> Move:
+    """Process pool entry point: the game arrives as encode_state() bytes."""
+    game_logic = GameLogic()
+    game_logic.game_state, _ = decode_state(state)
+    return search_move(game_logic, player_id, time_budget, random.Random(seed))
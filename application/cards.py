@@ -0,0 +1,86 @@
+from array import array
+from typing import Dict, Tuple
+
+from common.types import Card, get_card_mask
+
+COLORS = ("Blue", "Green", "Red", "Yellow")
+FACES = ("0", "1", "2", "3", "4", "5", "6", "7", "8", "9", "Skip", "Reverse", "Draw Two")
+WILD_FACES = ("Wild", "Wild Draw Four")
+WILD = "Wild"
+
+DECK_SIZE = 108
+MAX_CARDS = 256  # Kaardi id peab mahtuma array('B') sisse
+
+# Petukoodi kaardid saavad id-d tavalise paki järel olevatest vahemikest
+CHEAT_CARD_IDS: Dict[str, range] = {
+    "Wild Draw Four": range(DECK_SIZE, 182),
+    "Wild Draw Eight": range(182, MAX_CARDS),
+}
+
+
+def _build_card_table() -> Tuple[Card, ...]:
+    cards = []
+
+    def add_card(clr: str, fc: str):
+        cards.append(Card(clr, fc, len(cards)))
+
+    for color in COLORS:
+        for face in FACES:
+            add_card(color, face)
+            if face != "0":
+                add_card(color, face)
+
+    for face in WILD_FACES:
+        for _ in range(4):
+            add_card(WILD, face)
+
+    for face, ids in CHEAT_CARD_IDS.items():
+        for _ in ids:
+            add_card(WILD, face)
+
+    return tuple(cards)
+
+
+# Muutumatu kaarditabel: kaardi id on indeks
+CARDS: Tuple[Card, ...] = _build_card_table()
+CARD_COLORS: Tuple[str, ...] = tuple(card.color for card in CARDS)
+CARD_FACES: Tuple[str, ...] = tuple(card.face for card in CARDS)
+
+
+def new_pile(card_ids=()) -> array:
+    return array("B", card_ids)
+
+
+def get_card(card_id: int) -> Card:
+    return CARDS[card_id]
+
+
+def get_cards(card_ids) -> list[Card]:
+    return [CARDS[card_id] for card_id in card_ids]
+
+
+# Kaardi liik = (värv, nägu); sama liigi kaardid on mängus omavahel vahetatavad
+KINDS: Tuple[Tuple[str, str], ...] = tuple(
+    [(color, face) for color in COLORS for face in FACES] + [(WILD, face) for face in WILD_FACES + ("Wild Draw Eight",)]
+)
+KIND_INDEX: Dict[Tuple[str, str], int] = {kind: index for index, kind in enumerate(KINDS)}
+CARD_KINDS: bytes = bytes(KIND_INDEX[(card.color, card.face)] for card in CARDS)
+
+
+def iter_mask(mask: int):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+# Käidavuse tabel: pealmise kaardi (värv, nägu) -> bitimask kaartidest, mida selle peale võib käia
+COLOR_MASKS: Dict[str, int] = {
+    color: get_card_mask(card.id for card in CARDS if card.color == color) for color in COLORS + (WILD,)
+}
+WILD_DRAW_FOUR_MASK: int = get_card_mask(card.id for card in CARDS if card.face == "Wild Draw Four")
+LEGAL_MASKS: Dict[Tuple[str, str], int] = {
+    (color, face): COLOR_MASKS[color] | COLOR_MASKS[WILD] | get_card_mask(card.id for card in CARDS if card.face == face)
+    for color in COLORS + (WILD,)
+    for face in dict.fromkeys(face for _, face in KINDS)
+}
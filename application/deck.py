@@ -0,0 +1,104 @@
+import random
+from array import array
+from typing import Iterable, Optional, Tuple
+
+from application.cards import new_pile
+
+try:
+    import numpy as np
+except ImportError:  # NumPy on valikuline, ilma selleta segab random.Random
+    np = None
+
+
+# Fisher-Yates shuffle algorithm
+def shuffle(array, rng=random):
+    # NumPy Generator segab array('B') kaarte otse puhvris
+    if np is not None and isinstance(rng, np.random.Generator):
+        rng.shuffle(np.frombuffer(array, dtype=np.uint8))
+        return array
+
+    random_ = rng.random
+    for m in range(len(array) - 1, 0, -1):
+        i = int(random_() * (m + 1))
+        array[m], array[i] = array[i], array[m]
+
+    return array
+
+
+# Kasutatud kaardid on ahel (kaart, ülejäänud ahel); uus kaart lisab ühe lüli ja jagab ülejäänut
+Discards = Optional[Tuple[int, "Discards"]]
+
+
+class Deck:
+    """Draw pile and discard pile of one game. Never changed in place.
+
+    The draw pile is an immutable bytes object of which the first `draw_size`
+    cards are still in the pile; cards are drawn from its end, so drawing only
+    makes a Deck with a smaller `draw_size` around the same bytes. The discard
+    pile is a linked chain with the top card first, so discarding adds one
+    link in front of the old chain. Only reshuffling builds a new draw pile.
+    """
+
+    __slots__ = ("draw_pile", "draw_size", "discards", "discard_size")
+
+    def __init__(self, draw_pile: bytes = b"", draw_size: Optional[int] = None, discards: Discards = None,
+                 discard_size: int = 0):
+        self.draw_pile = draw_pile
+        self.draw_size = len(draw_pile) if draw_size is None else draw_size
+        self.discards = discards
+        self.discard_size = discard_size
+
+    @classmethod
+    def from_piles(cls, draw_pile: Iterable[int], discard_pile: Iterable[int] = ()) -> "Deck":
+        """Builds a deck from piles ordered bottom first: the last card is drawn or on top."""
+        discards = None
+        discard_size = 0
+        for card_id in discard_pile:
+            discards = (card_id, discards)
+            discard_size += 1
+        return cls(bytes(draw_pile), None, discards, discard_size)
+
+    def get_draw_pile(self) -> array:
+        return new_pile(self.draw_pile[:self.draw_size])
+
+    def get_discard_pile(self) -> array:
+        pile = new_pile()
+        node = self.discards
+        while node is not None:
+            pile.append(node[0])
+            node = node[1]
+        pile.reverse()
+        return pile
+
+    def get_top(self) -> Optional[int]:
+        if self.discards is None:
+            return None
+        return self.discards[0]
+
+    def discard(self, card_id: int) -> "Deck":
+        return Deck(self.draw_pile, self.draw_size, (card_id, self.discards), self.discard_size + 1)
+
+    def reshuffle(self, rng) -> "Deck":
+        """Turns the discard pile under the top card into the draw pile.
+
+        `rng` is a random.Random or a NumPy Generator; it is advanced in place.
+        """
+        if self.discard_size <= 1:
+            return self
+
+        # Kõik peale pealmise kaardi saab uueks pakiks, pealmisest allapoole
+        cards = new_pile()
+        node = self.discards[1]
+        while node is not None:
+            cards.append(node[0])
+            node = node[1]
+
+        shuffle(cards, rng)
+        draw_pile = self.draw_pile[:self.draw_size] + cards.tobytes()
+        return Deck(draw_pile, None, (self.discards[0], None), 1)
+
+    def draw_n(self, count: int) -> Tuple["Deck", bytes]:
+        """Draws up to `count` cards from the draw pile without reshuffling; returns the new deck and the cards."""
+        taken = min(count, self.draw_size)
+        draw_size = self.draw_size - taken
+        return Deck(self.draw_pile, draw_size, self.discards, self.discard_size), self.draw_pile[draw_size:self.draw_size]
@@ -0,0 +1,176 @@
+"""Durable storage for running games in a local SQLite database (WAL mode).
+
+Writes are buffered in memory and committed together: repeated saves of one
+game between two flushes turn into one row write, and one transaction (one
+fsync) covers every game changed during the flush interval.
+"""
+import asyncio
+import os
+import sqlite3
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from application.event_log import encode_snapshot, restore_snapshot
+from application.game_logic import GameLogic
+
+GameKey = Tuple[int, int]  # (guild id, channel id)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER,
+    initiator_id INTEGER,
+    player_ids BLOB NOT NULL,
+    last_player_id INTEGER,
+    state BLOB,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (guild_id, channel_id)
+);
+CREATE INDEX IF NOT EXISTS games_message_id ON games (message_id);
+"""
+
+
+def encode_ids(ids: List[int]) -> bytes:
+    return struct.pack(f"<{len(ids)}Q", *ids)
+
+
+def decode_ids(data: bytes) -> List[int]:
+    return list(struct.unpack(f"<{len(data) // 8}Q", data))
+
+
+class GameRecord:
+    __slots__ = ("key", "message_id", "initiator_id", "player_ids", "last_player_id", "game_logic", "updated_at")
+
+    def __init__(self, key: GameKey, message_id: Optional[int], initiator_id: Optional[int], player_ids: List[int],
+                 last_player_id: Optional[int] = None, game_logic: Optional[GameLogic] = None,
+                 updated_at: Optional[float] = None):
+        self.key = key
+        self.message_id = message_id
+        self.initiator_id = initiator_id
+        self.player_ids = player_ids
+        self.last_player_id = last_player_id
+        self.game_logic = game_logic  # None while the game is still a lobby
+        self.updated_at = updated_at  # time.time() of the last activity; None = now
+
+    def to_row(self) -> tuple:
+        state = encode_snapshot(self.game_logic) if self.game_logic is not None else None
+        return (self.key[0], self.key[1], self.message_id, self.initiator_id, encode_ids(self.player_ids),
+                self.last_player_id, state, self.updated_at or time.time())
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "GameRecord":
+        guild_id, channel_id, message_id, initiator_id, player_ids, last_player_id, state, updated_at = row
+        game_logic = restore_snapshot(memoryview(state)) if state is not None else None
+        return cls((guild_id, channel_id), message_id, initiator_id, decode_ids(player_ids), last_player_id, game_logic,
+                   updated_at)
+
+
+class GameStore:
+    def __init__(self, path: str, flush_interval: float = 0.5, max_batch: int = 500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.pending: Dict[GameKey, Optional[tuple]] = {}  # None = delete
+        self.in_flight: Dict[GameKey, Optional[tuple]] = {}  # Praegu kirjutatav partii, kuni see on salvestatud
+        self.flush_task: Optional[asyncio.Task] = None
+        self.lock = asyncio.Lock()
+        self.connection_lock = threading.Lock()  # Ühendust kasutab korraga üks lõim
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def save(self, record: GameRecord) -> None:
+        # Serialiseerime kohe, et hilisem kirjutamine ei näeks poolikut olekut
+        self.pending[record.key] = record.to_row()
+        self.schedule_flush()
+
+    def delete(self, key: GameKey) -> None:
+        self.pending[key] = None
+        self.schedule_flush()
+
+    def schedule_flush(self) -> None:
+        if len(self.pending) >= self.max_batch:
+            asyncio.get_running_loop().create_task(self.flush())
+        elif self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush_later())
+
+    async def flush_later(self) -> None:
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self.lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+            # Kuni partii pole salvestatud, loetakse neid mänge siit, mitte andmebaasist
+            self.in_flight = batch
+            try:
+                await asyncio.to_thread(self.write_batch, batch)
+            finally:
+                self.in_flight = {}
+
+    def write_batch(self, batch: Dict[GameKey, Optional[tuple]]) -> None:
+        rows = [row for row in batch.values() if row is not None]
+        deleted = [key for key, row in batch.items() if row is None]
+        with self.connection_lock, self.connection:
+            self.connection.execute("BEGIN")
+            if rows:
+                self.connection.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            if deleted:
+                self.connection.executemany("DELETE FROM games WHERE guild_id = ? AND channel_id = ?", deleted)
+
+    def get_buffered(self) -> Dict[GameKey, Optional[tuple]]:
+        """Rows not yet committed, newest version of each game."""
+        return {**self.in_flight, **self.pending}
+
+    def get_pending(self, key: GameKey) -> Tuple[bool, Optional[GameRecord]]:
+        for buffer in (self.pending, self.in_flight):
+            if key in buffer:
+                row = buffer[key]
+                return True, GameRecord.from_row(row) if row is not None else None
+        return False, None
+
+    async def load(self, key: GameKey) -> Optional[GameRecord]:
+        is_pending, record = self.get_pending(key)
+        if is_pending:
+            return record
+        row = await asyncio.to_thread(self.fetch_row, "guild_id = ? AND channel_id = ?", key)
+        return GameRecord.from_row(row) if row is not None else None
+
+    async def load_by_message(self, message_id: int) -> Optional[GameRecord]:
+        for key, row in self.get_buffered().items():
+            if row is not None and row[2] == message_id:
+                return GameRecord.from_row(row)
+        row = await asyncio.to_thread(self.fetch_row, "message_id = ?", (message_id,))
+        if row is None or (row[0], row[1]) in self.pending or (row[0], row[1]) in self.in_flight:
+            return None  # Ootel kustutamine või uuem versioon
+        return GameRecord.from_row(row)
+
+    async def find_idle(self, before: float) -> List[Tuple[GameKey, Optional[int]]]:
+        """Keys and message ids of stored games last saved before `before` (a time.time() value)."""
+        await self.flush()
+        rows = await asyncio.to_thread(self.fetch_idle, before)
+        return [((guild_id, channel_id), message_id) for guild_id, channel_id, message_id in rows]
+
+    def fetch_row(self, where: str, params: tuple) -> Optional[tuple]:
+        with self.connection_lock:
+            return self.connection.execute(f"SELECT * FROM games WHERE {where}", params).fetchone()
+
+    def fetch_idle(self, before: float) -> List[tuple]:
+        with self.connection_lock:
+            return self.connection.execute(
+                "SELECT guild_id, channel_id, message_id FROM games WHERE updated_at < ?", (before,)
+            ).fetchall()
+
+    async def close(self) -> None:
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+        await self.flush()
+        self.connection.close()
@@ -0,0 +1,338 @@
+"""Headless batch simulator for the UNO rules in GameLogic.
+
+Many games are played at once: hands are card-kind count matrices, decks are
+per-game rows with a draw cursor and every rule is applied to all running
+games with NumPy array operations. Run it with
+
+    python -m application.simulation --games 1000000 --players 4 --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import List, Optional
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from application.cards import CARD_KINDS, COLORS, DECK_SIZE, FACES, KINDS, WILD
+from application.game_logic import GameLogic
+from application.types import GameCheat
+
+KIND_COUNT = len(KINDS)
+WILD_COLOR = len(COLORS)
+KIND_COLOR = np.array([COLORS.index(color) if color != WILD else WILD_COLOR for color, _ in KINDS], dtype=np.int8)
+ALL_FACES = list(dict.fromkeys(face for _, face in KINDS))
+KIND_FACE = np.array([ALL_FACES.index(face) for _, face in KINDS], dtype=np.int8)
+
+WILD_DRAW_FOUR = KINDS.index((WILD, "Wild Draw Four"))
+WILD_DRAW_EIGHT = KINDS.index((WILD, "Wild Draw Eight"))
+BASE_DECK = np.frombuffer(CARD_KINDS[:DECK_SIZE], dtype=np.uint8)
+
+# Mitu kaarti järgmine mängija võtab ja kas ta jäetakse vahele
+KIND_PENALTY = np.zeros(KIND_COUNT, dtype=np.int8)
+KIND_SKIP = np.zeros(KIND_COUNT, dtype=bool)
+KIND_REVERSE = np.zeros(KIND_COUNT, dtype=bool)
+for _kind, (_color, _face) in enumerate(KINDS):
+    KIND_PENALTY[_kind] = {"Draw Two": 2, "Wild Draw Four": 4, "Wild Draw Eight": 8}.get(_face, 0)
+    KIND_SKIP[_kind] = _face in ("Skip", "Draw Two", "Wild Draw Eight")
+    KIND_REVERSE[_kind] = _face == "Reverse"
+
+CHEAT_KINDS = {
+    GameCheat.GIVE_WILD_FOUR: WILD_DRAW_FOUR,
+    GameCheat.GIVE_WILD_EIGHT: WILD_DRAW_EIGHT,
+}
+
+
+class RandomPolicy:
+    """Plays a uniformly random legal card, draws only when nothing is playable."""
+
+    def __init__(self, uno_rate: float = 1.0):
+        self.uno_rate = uno_rate
+
+    def card_scores(self, rng: np.random.Generator, hands: np.ndarray) -> np.ndarray:
+        return rng.random(hands.shape)
+
+    def choose_cards(self, rng: np.random.Generator, hands: np.ndarray, legal: np.ndarray) -> np.ndarray:
+        scores = np.where(legal, self.card_scores(rng, hands) + 1.0, 0.0)
+        choice = scores.argmax(axis=1)
+        return np.where(legal.any(axis=1), choice, -1)
+
+    def choose_colors(self, rng: np.random.Generator, hands: np.ndarray) -> np.ndarray:
+        color_counts = np.stack([hands[:, KIND_COLOR == color].sum(axis=1) for color in range(WILD_COLOR)], axis=1)
+        return (color_counts + rng.random(color_counts.shape)).argmax(axis=1)
+
+    def says_uno(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        return rng.random(count) < self.uno_rate
+
+
+class GreedyPolicy(RandomPolicy):
+    """Gets rid of action cards first and keeps Wild cards for last."""
+
+    PRIORITY = np.where(KIND_COLOR == WILD_COLOR, 0.0, np.where(KIND_FACE >= FACES.index("Skip"), 2.0, 1.0))
+
+    def card_scores(self, rng: np.random.Generator, hands: np.ndarray) -> np.ndarray:
+        return (self.PRIORITY + rng.random(hands.shape)) / 3.0
+
+
+POLICIES = {
+    "random": RandomPolicy,
+    "greedy": GreedyPolicy,
+}
+
+
+class SimulationStats:
+    def __init__(self, player_count: int):
+        self.player_count = player_count
+        self.games = 0
+        self.unfinished = 0
+        self.wins = np.zeros(player_count, dtype=np.int64)
+        self.turns: List[np.ndarray] = []
+        self.elapsed = 0.0
+
+    def merge(self, other: "SimulationStats") -> None:
+        self.games += other.games
+        self.unfinished += other.unfinished
+        self.wins += other.wins
+        self.turns.extend(other.turns)
+
+    def report(self) -> str:
+        turns = np.concatenate(self.turns) if self.turns else np.zeros(1)
+        finished = self.games - self.unfinished
+        lines = [
+            f"Games: {self.games} ({self.unfinished} unfinished)",
+            f"Throughput: {self.games / self.elapsed:.0f} games/sec" if self.elapsed else "Throughput: -",
+            f"Turns: mean {turns.mean():.1f}, p50 {np.percentile(turns, 50):.0f}, p99 {np.percentile(turns, 99):.0f}",
+        ]
+        for seat, wins in enumerate(self.wins):
+            rate = wins / finished if finished else 0.0
+            lines.append(f"Seat {seat} win rate: {rate:.2%}")
+        return "\n".join(lines)
+
+
+class BatchSimulator:
+    def __init__(self, games: int, player_count: int, policy: Optional[RandomPolicy] = None, seed: Optional[int] = None,
+                 cheats: Optional[dict] = None, max_turns: int = 2000):
+        if not 2 <= player_count <= 10:
+            raise ValueError("Player count must be between 2 and 10")
+
+        self.games = games
+        self.player_count = player_count
+        self.policy = policy or RandomPolicy()
+        self.rng = np.random.default_rng(seed)
+        self.max_turns = max_turns
+
+        extra_cards = sum(count for _, count in (cheats or {}).values())
+        capacity = DECK_SIZE + extra_cards
+        games_range = np.arange(games)
+
+        self.deck = np.zeros((games, capacity), dtype=np.uint8)
+        self.deck[:, :DECK_SIZE] = self.rng.permuted(np.tile(BASE_DECK, (games, 1)), axis=1)
+        self.deck_size = np.full(games, DECK_SIZE, dtype=np.int32)
+        self.cursor = np.full(games, 7 * player_count, dtype=np.int32)
+
+        dealt = self.deck[:, :7 * player_count].reshape(games, player_count, 7).astype(np.int64)
+        slots = (games_range[:, None, None] * player_count + np.arange(player_count)[None, :, None]) * KIND_COUNT + dealt
+        self.hands = np.bincount(slots.ravel(), minlength=games * player_count * KIND_COUNT).astype(np.int16)
+        self.hands = self.hands.reshape(games, player_count, KIND_COUNT)
+
+        for seat, (game_cheat, count) in (cheats or {}).items():
+            self.hands[:, seat, CHEAT_KINDS[game_cheat]] += count
+
+        self.discard = np.zeros((games, KIND_COUNT), dtype=np.int16)  # ilma pealmise kaardita
+        self.top = np.full(games, -1, dtype=np.int16)
+        self.top_color = np.full(games, -1, dtype=np.int8)
+        self.current = np.zeros(games, dtype=np.int32)
+        self.direction = np.ones(games, dtype=np.int32)
+        self.said_uno = np.zeros(games, dtype=bool)
+        self.turns = np.zeros(games, dtype=np.int32)
+        self.winner = np.full(games, -1, dtype=np.int32)
+
+    def reshuffle(self, game: int) -> None:
+        kinds = np.repeat(np.arange(KIND_COUNT, dtype=np.uint8), self.discard[game])
+        self.rng.shuffle(kinds)
+        self.deck[game, :len(kinds)] = kinds
+        self.deck_size[game] = len(kinds)
+        self.cursor[game] = 0
+        self.discard[game] = 0
+
+    def draw(self, games: np.ndarray, seats: np.ndarray, counts: np.ndarray) -> None:
+        for step in range(int(counts.max(initial=0))):
+            selected = counts > step
+            game_ids, seat_ids = games[selected], seats[selected]
+
+            for game in game_ids[self.cursor[game_ids] >= self.deck_size[game_ids]]:
+                self.reshuffle(game)
+
+            has_cards = self.cursor[game_ids] < self.deck_size[game_ids]
+            game_ids, seat_ids = game_ids[has_cards], seat_ids[has_cards]
+            kinds = self.deck[game_ids, self.cursor[game_ids]]
+            self.cursor[game_ids] += 1
+            self.hands[game_ids, seat_ids, kinds] += 1
+
+    def legal_moves(self, games: np.ndarray, hands: np.ndarray) -> np.ndarray:
+        top = self.top[games]
+        no_top = top < 0
+        top_color = self.top_color[games]
+        top_face = np.where(no_top, -1, KIND_FACE[np.maximum(top, 0)])
+
+        matches = ((KIND_COLOR[None, :] == top_color[:, None]) | (KIND_FACE[None, :] == top_face[:, None])
+                   | (KIND_COLOR[None, :] == WILD_COLOR) | no_top[:, None])
+        has_top_color = (hands * (KIND_COLOR[None, :] == top_color[:, None])).sum(axis=1) > 0
+        matches[:, WILD_DRAW_FOUR] = no_top | ~has_top_color
+        return (hands > 0) & matches
+
+    def step(self, games: np.ndarray) -> None:
+        seats = self.current[games]
+        hands = self.hands[games, seats]
+        hand_sizes = hands.sum(axis=1)
+
+        # UNO tuleb öelda enne eelviimase kaardi käimist
+        self.said_uno[games] = (hand_sizes == 2) & self.policy.says_uno(self.rng, len(games))
+
+        choice = self.policy.choose_cards(self.rng, hands, self.legal_moves(games, hands))
+        plays = choice >= 0
+
+        draw_games, draw_seats = games[~plays], seats[~plays]
+        self.draw(draw_games, draw_seats, np.ones(len(draw_games), dtype=np.int32))
+
+        play_games, play_seats, kinds = games[plays], seats[plays], choice[plays]
+        self.hands[play_games, play_seats, kinds] -= 1
+        had_top = self.top[play_games] >= 0
+        self.discard[play_games[had_top], self.top[play_games[had_top]]] += 1
+        self.top[play_games] = kinds
+
+        colors = KIND_COLOR[kinds].astype(np.int8)
+        is_wild = colors == WILD_COLOR
+        if is_wild.any():
+            colors[is_wild] = self.policy.choose_colors(self.rng, self.hands[play_games[is_wild], play_seats[is_wild]])
+        self.top_color[play_games] = colors
+
+        self.direction[play_games] *= np.where(KIND_REVERSE[kinds], -1, 1)
+        won = self.hands[play_games, play_seats].sum(axis=1) == 0
+        self.winner[play_games[won]] = play_seats[won]
+
+        penalty = KIND_PENALTY[kinds].astype(np.int32)
+        next_seats = (play_seats + self.direction[play_games]) % self.player_count
+        self.draw(play_games, next_seats, np.where(won, 0, penalty))
+
+        # next_turn: karistus, kui üks kaart jäi ja UNO jäi ütlemata
+        forgot_uno = (self.hands[games, seats].sum(axis=1) == 1) & ~self.said_uno[games]
+        self.draw(games[forgot_uno], seats[forgot_uno], np.full(int(forgot_uno.sum()), 2, dtype=np.int32))
+
+        skip = np.zeros(len(games), dtype=np.int32)
+        skip[plays] = KIND_SKIP[kinds]
+        self.current[games] = (seats + self.direction[games] * (1 + skip)) % self.player_count
+        self.turns[games] += 1
+
+    def run(self) -> SimulationStats:
+        started = time.perf_counter()
+        running = np.arange(self.games)
+        while len(running):
+            self.step(running)
+            running = running[(self.winner[running] < 0) & (self.turns[running] < self.max_turns)]
+
+        stats = SimulationStats(self.player_count)
+        stats.games = self.games
+        stats.unfinished = int((self.winner < 0).sum())
+        stats.wins = np.bincount(self.winner[self.winner >= 0], minlength=self.player_count).astype(np.int64)
+        stats.turns.append(self.turns.copy())
+        stats.elapsed = time.perf_counter() - started
+        return stats
+
+
+def _run_batch(args) -> SimulationStats:
+    games, player_count, policy_name, seed, cheats, max_turns = args
+    simulator = BatchSimulator(games, player_count, POLICIES[policy_name](), seed, cheats, max_turns)
+    return simulator.run()
+
+
+def simulate(games: int, player_count: int, policy_name: str = "random", batch_size: int = 20000,
+             workers: int = 1, seed: Optional[int] = None, cheats: Optional[dict] = None,
+             max_turns: int = 2000) -> SimulationStats:
+    seeds = np.random.SeedSequence(seed).generate_state((games + batch_size - 1) // batch_size)
+    batches = [
+        (min(batch_size, games - start), player_count, policy_name, int(batch_seed), cheats, max_turns)
+        for start, batch_seed in zip(range(0, games, batch_size), seeds)
+    ]
+
+    started = time.perf_counter()
+    stats = SimulationStats(player_count)
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            for batch_stats in pool.imap_unordered(_run_batch, batches):
+                stats.merge(batch_stats)
+    else:
+        for batch in batches:
+            stats.merge(_run_batch(batch))
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def simulate_game_logic(games: int, player_count: int, seed: Optional[int] = None, max_turns: int = 2000) -> SimulationStats:
+    """Plays whole games through GameLogic itself, one action at a time, for load-testing the engine."""
+    rng = random.Random(seed)
+    stats = SimulationStats(player_count)
+    turns = np.zeros(games, dtype=np.int32)
+    started = time.perf_counter()
+
+    for game in range(games):
+        game_logic = GameLogic()
+        game_logic.start_game(list(range(player_count)))
+        for turn in range(max_turns):
+            player = game_logic.get_current_player()
+            if len(player.hand) == 2:
+                game_logic.say_uno(player.id)
+
+            playable = [card for card in game_logic.get_player_cards(player.id) if game_logic.can_play_card(card, player.id)]
+            if not playable:
+                game_logic.draw_card(player.id)
+                continue
+
+            card = rng.choice(playable)
+            game_logic.play_card(player.id, card.id)
+            if card.color == WILD:
+                game_logic.change_wild_card_color(card.id, rng.choice(COLORS))
+            if game_logic.is_winner(player.id):
+                stats.wins[game_logic.get_seat(player.id)] += 1
+                turns[game] = turn + 1
+                break
+        else:
+            stats.unfinished += 1
+            turns[game] = max_turns
+
+    stats.games = games
+    stats.turns.append(turns)
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate UNO games without Discord")
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--batch-size", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-turns", type=int, default=2000)
+    parser.add_argument("--cheat", choices=[cheat.value for cheat in GameCheat], default=None,
+                        help="Give the cheat card to seat 0 at the start of every game")
+    parser.add_argument("--cheat-count", type=int, default=1)
+    parser.add_argument("--game-logic", action="store_true", help="Play through GameLogic instead of the batch engine")
+    args = parser.parse_args()
+
+    if args.game_logic:
+        stats = simulate_game_logic(args.games, args.players, args.seed, args.max_turns)
+    else:
+        cheats = {0: (GameCheat(args.cheat), args.cheat_count)} if args.cheat else None
+        stats = simulate(args.games, args.players, args.policy, args.batch_size, args.workers, args.seed, cheats,
+                         args.max_turns)
+    print(stats.report())
+
+
+if __name__ == "__main__":
+    main()
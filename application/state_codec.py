@@ -0,0 +1,101 @@
+"""Compact binary form of GameState and the game's RNG state."""
+import struct
+from typing import Tuple
+
+from application.cards import COLORS
+from application.deck import Deck
+from common.types import GameState, Player
+
+try:
+    import numpy as np
+except ImportError:  # NumPy on valikuline
+    np = None
+
+FORMAT_VERSION = 1
+NO_COLOR = 0xFF
+
+# version, player count, current index, flags, wild color, cheat counts (Wild Draw Four, Wild Draw Eight), deck, discard
+STATE_HEADER = struct.Struct("<BBBBBBBHH")
+PLAYER_HEADER = struct.Struct("<QBH")  # id, flags, hand size
+RNG_STATE = struct.Struct("<625IBd")  # Mersenne Twister state, has gauss_next, gauss_next
+BULK_RNG_STATE = struct.Struct("<QQQQBI")  # PCG64 state and increment (low, high), has_uint32, uinteger
+MASK_64 = (1 << 64) - 1
+
+IS_REVERSED = 1
+HAS_PLAYED_CARD = 1
+HAS_SAID_UNO = 2
+
+
+def encode_state(state: GameState) -> bytes:
+    wild_color = COLORS.index(state.wild_color) if state.wild_color is not None else NO_COLOR
+    parts = [
+        STATE_HEADER.pack(FORMAT_VERSION, len(state.players), state.current_player_index,
+                          IS_REVERSED if state.is_reversed else 0, wild_color,
+                          state.cheat_counts.get("Wild Draw Four", 0), state.cheat_counts.get("Wild Draw Eight", 0),
+                          state.deck.draw_size, state.deck.discard_size),
+        state.deck.get_draw_pile().tobytes(),
+        state.deck.get_discard_pile().tobytes(),
+    ]
+    for player in state.players:
+        flags = (HAS_PLAYED_CARD if player.has_played_card else 0) | (HAS_SAID_UNO if player.has_said_uno else 0)
+        parts.append(PLAYER_HEADER.pack(player.id, flags, len(player.hand)))
+        parts.append(player.hand)
+    return b"".join(parts)
+
+
+def decode_state(data: bytes, offset: int = 0) -> Tuple[GameState, int]:
+    (version, player_count, current_index, flags, wild_color, wild_four_count, wild_eight_count, deck_size,
+     discard_size) = STATE_HEADER.unpack_from(data, offset)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unknown game state format: {version}")
+    offset += STATE_HEADER.size
+
+    deck = Deck.from_piles(data[offset:offset + deck_size], data[offset + deck_size:offset + deck_size + discard_size])
+    offset += deck_size + discard_size
+
+    players = []
+    for _ in range(player_count):
+        player_id, player_flags, hand_size = PLAYER_HEADER.unpack_from(data, offset)
+        offset += PLAYER_HEADER.size
+        hand = data[offset:offset + hand_size]
+        offset += hand_size
+        players.append(Player(player_id, hand, bool(player_flags & HAS_PLAYED_CARD), bool(player_flags & HAS_SAID_UNO)))
+
+    cheat_counts = {face: count for face, count in (("Wild Draw Four", wild_four_count),
+                                                    ("Wild Draw Eight", wild_eight_count)) if count}
+    state = GameState(current_index, deck, bool(flags & IS_REVERSED), players,
+                      COLORS[wild_color] if wild_color != NO_COLOR else None, cheat_counts)
+    return state, offset
+
+
+def encode_rng_state(rng_state: tuple) -> bytes:
+    """`rng_state` is random.Random.getstate()."""
+    _, internal_state, gauss_next = rng_state
+    return RNG_STATE.pack(*internal_state, gauss_next is not None, gauss_next or 0.0)
+
+
+def decode_rng_state(data: bytes, offset: int = 0) -> Tuple[tuple, int]:
+    values = RNG_STATE.unpack_from(data, offset)
+    return (3, tuple(values[:625]), values[626] if values[625] else None), offset + RNG_STATE.size
+
+
+def encode_bulk_rng_state(bit_generator: dict) -> bytes:
+    """`bit_generator` is the NumPy bit generator state."""
+    if bit_generator["bit_generator"] != "PCG64":
+        raise ValueError(f"Unsupported bit generator: {bit_generator['bit_generator']}")
+    state, inc = bit_generator["state"]["state"], bit_generator["state"]["inc"]
+    return BULK_RNG_STATE.pack(state & MASK_64, state >> 64, inc & MASK_64, inc >> 64,
+                               bit_generator["has_uint32"], bit_generator["uinteger"])
+
+
+def decode_bulk_rng_state(data: bytes, offset: int = 0) -> Tuple[dict, int]:
+    if np is None:
+        raise ValueError("NumPy is required to restore this game")
+    state_low, state_high, inc_low, inc_high, has_uint32, uinteger = BULK_RNG_STATE.unpack_from(data, offset)
+    bit_generator = {
+        "bit_generator": "PCG64",
+        "state": {"state": state_high << 64 | state_low, "inc": inc_high << 64 | inc_low},
+        "has_uint32": has_uint32,
+        "uinteger": uinteger,
+    }
+    return bit_generator, offset + BULK_RNG_STATE.size
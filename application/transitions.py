@@ -0,0 +1,321 @@
+"""UNO rules as pure transitions: apply(state, action) -> new state.
+
+A GameState is never changed in place. Every transition returns a new state
+that shares all it did not touch with the old one: the players tuple is
+rebuilt, but only the changed player gets a new hand, and the deck shares its
+draw pile bytes and discard chain. Keeping an old state - a snapshot, an undo
+step or a branch of a search - therefore costs only what the action changed.
+
+An action is a tuple of its EventType and the same arguments the event log
+records for it, e.g. (EventType.PLAY_CARD, player_id, card_id). A move that
+is against the rules raises IllegalAction and leaves the state as it was.
+
+Inside a transition the new state is filled in step by step before it is
+returned; nothing else can see it yet, so that is not a change in place.
+"""
+import random
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+from application.cards import (CARD_COLORS, CARD_FACES, CARDS, CHEAT_CARD_IDS, COLOR_MASKS, DECK_SIZE, LEGAL_MASKS,
+                               WILD, WILD_DRAW_FOUR_MASK, new_pile)
+from application.deck import Deck, np, shuffle
+from application.state_codec import (decode_bulk_rng_state, decode_rng_state, encode_bulk_rng_state,
+                                     encode_rng_state)
+from application.types import EventType, GameCheat
+from common.types import Card, GameState, Player
+
+Action = tuple
+
+
+class IllegalAction(Exception):
+    pass
+
+
+def new_bulk_rng(seed: int):
+    """NumPy Generator for the game's deck permutations, None when NumPy is not installed."""
+    if np is None:
+        return None
+    return np.random.default_rng(seed)
+
+
+def create_cards() -> array:
+    return new_pile(range(DECK_SIZE))
+
+
+def distribute_cards(players: List[Player], deck: Deck) -> Tuple[List[Player], Deck]:
+    dealt = []
+    for player in players:
+        deck, hand = deck.draw_n(7)
+        dealt.append(player.set_hand(hand))
+    return dealt, deck
+
+
+def new_state() -> GameState:
+    return GameState(0, Deck(), False, ())
+
+
+def load_deck_rng(state: GameState):
+    """Live generator for the next reshuffle, rebuilt from the packed state it was saved in."""
+    if state.bulk_rng is not None:
+        if np is None:
+            raise ValueError("NumPy is required to continue this game")
+        bit_generator = np.random.PCG64()
+        bit_generator.state = decode_bulk_rng_state(state.bulk_rng)[0]
+        return np.random.Generator(bit_generator)
+
+    rng = random.Random(state.seed)
+    if state.rng is not None:
+        rng.setstate(decode_rng_state(state.rng)[0])
+    return rng
+
+
+def save_deck_rng(state: GameState, rng) -> dict:
+    if state.bulk_rng is not None:
+        return {"bulk_rng": encode_bulk_rng_state(rng.bit_generator.state)}
+    return {"rng": encode_rng_state(rng.getstate())}
+
+
+def get_seat(state: GameState, player_id) -> int:
+    seat = state.seats.get(player_id)
+    if seat is None:
+        raise ValueError("Player not found")
+    return seat
+
+
+def get_player(state: GameState, player_id) -> Player:
+    return state.players[get_seat(state, player_id)]
+
+
+def seat_after(state: GameState, steps: int = 1) -> int:
+    player_count = len(state.players)
+    if not player_count:
+        raise ValueError("No players in the game")
+    direction = -1 if state.is_reversed else 1
+    return (state.current_player_index + direction * steps) % player_count
+
+
+def set_player(state: GameState, seat: int, player: Player) -> GameState:
+    players = state.players
+    return state.replace(players=players[:seat] + (player,) + players[seat + 1:])
+
+
+def get_top_card(state: GameState) -> Optional[Card]:
+    top_card_id = state.deck.get_top()
+    if top_card_id is None:
+        return None
+    card = CARDS[top_card_id]
+    if state.wild_color is not None:
+        return Card(state.wild_color, card.face, card.id)
+    return card
+
+
+def get_playable_mask(state: GameState, player: Player) -> int:
+    top_card_id = state.deck.get_top()
+    if top_card_id is None:
+        return player.hand_mask
+
+    top_key = (state.wild_color or CARD_COLORS[top_card_id], CARD_FACES[top_card_id])
+    mask = player.hand_mask & LEGAL_MASKS[top_key]
+
+    # Wild Draw Four on lubatud ainult siis, kui käes pole pealmise kaardi värvi
+    if player.hand_mask & COLOR_MASKS[top_key[0]]:
+        mask &= ~WILD_DRAW_FOUR_MASK
+    return mask
+
+
+def can_play_card(state: GameState, player: Player, card: Card) -> bool:
+    top_card = get_top_card(state)
+    if top_card is None:
+        return True
+
+    if card.face != "Wild Draw Four":
+        return bool(LEGAL_MASKS[(top_card.color, top_card.face)] >> card.id & 1)
+    return not player.hand_mask & COLOR_MASKS[top_card.color]
+
+
+def draw_into(state: GameState, players: List[Player], seat: int, count: int) -> None:
+    """Draws cards into a new state that is still being built, `players` is its player list."""
+    # Tühja paki korral segatakse kasutatud kaardid (peale pealmise) uueks pakiks
+    deck = state.deck
+    rng = None
+    drawn = b""
+    while count > 0:
+        if not deck.draw_size:
+            if deck.discard_size <= 1:
+                break  # Kõik kaardid on mängijate käes
+            if rng is None:
+                rng = load_deck_rng(state)
+            deck = deck.reshuffle(rng)
+
+        deck, cards = deck.draw_n(count)
+        drawn += cards
+        count -= len(cards)
+
+    if rng is not None:
+        for name, value in save_deck_rng(state, rng).items():
+            setattr(state, name, value)
+    state.deck = deck
+    players[seat] = players[seat].add_cards(drawn)
+
+
+def end_turn(state: GameState, players: List[Player], skip: int = 0) -> GameState:
+    seat = state.current_player_index
+    if len(players[seat].hand) == 1 and not players[seat].has_said_uno:
+        draw_into(state, players, seat, 2)
+
+    player = players[seat]
+    if player.has_played_card or player.has_said_uno:
+        players[seat] = player.replace(has_played_card=False, has_said_uno=False)
+    state.players = tuple(players)
+    state.current_player_index = seat_after(state, 1 + skip)
+    return state
+
+
+def draw_cards(state: GameState, seat: int, count: int) -> GameState:
+    state = state.replace()
+    players = list(state.players)
+    draw_into(state, players, seat, count)
+    state.players = tuple(players)
+    return state
+
+
+def next_turn(state: GameState, skip: int = 0) -> GameState:
+    return end_turn(state.replace(), list(state.players), skip)
+
+
+def start_game(state: GameState, seed: int, player_ids, use_numpy: Optional[bool] = None) -> GameState:
+    # Sama seemne ja mängijatega mäng kulgeb täpselt samamoodi
+    rng = random.Random(seed)
+    bulk_rng = new_bulk_rng(seed) if use_numpy or use_numpy is None else None
+    if use_numpy and bulk_rng is None:
+        raise ValueError("NumPy is not installed")
+
+    players = shuffle([Player(pid) for pid in player_ids], rng)
+    deck = Deck.from_piles(shuffle(create_cards(), bulk_rng if bulk_rng is not None else rng))
+    players, deck = distribute_cards(players, deck)
+    # NumPy-ga segatud mängus on random.Random vaja ainult istekohtade jaoks, selle olekut ei hoita
+    if bulk_rng is not None:
+        return GameState(0, deck, False, players, seed=seed,
+                         bulk_rng=encode_bulk_rng_state(bulk_rng.bit_generator.state))
+    return GameState(0, deck, False, players, seed=seed, rng=encode_rng_state(rng.getstate()))
+
+
+def play_card(state: GameState, player_id, card_id: int) -> GameState:
+    seat = get_seat(state, player_id)
+    player = state.players[seat]
+
+    if seat != state.current_player_index:
+        raise IllegalAction("Not the player's turn")
+    if player.has_played_card:
+        raise IllegalAction("Player has already played a card")
+
+    if not player.hand_mask >> card_id & 1:
+        raise IllegalAction("Card not found in player's hand")
+
+    if not can_play_card(state, player, CARDS[card_id]):
+        raise IllegalAction("Cannot play this card")
+
+    # has_played_card jääb panemata: käik lõpeb kohe ja end_turn nullib selle niikuinii
+    state = state.replace(deck=state.deck.discard(card_id), wild_color=None)
+    players = list(state.players)
+    players[seat] = player.remove_card(card_id)
+
+    skip = 0
+    face = CARD_FACES[card_id]
+    if face == "Wild Draw Four":
+        draw_into(state, players, seat_after(state), 4)
+    elif face == "Wild Draw Eight":
+        draw_into(state, players, seat_after(state), 8)
+        skip = 1
+    elif face == "Reverse":
+        state.is_reversed = not state.is_reversed
+    elif face == "Skip":
+        skip = 1
+    elif face == "Draw Two":
+        draw_into(state, players, seat_after(state), 2)
+        skip = 1
+
+    return end_turn(state, players, skip)
+
+
+def change_wild_card_color(state: GameState, card_id: int, new_color: str) -> GameState:
+    top_card_id = state.deck.get_top()
+    if top_card_id is None:
+        raise IllegalAction("No cards in discard pile")
+
+    if top_card_id != card_id:
+        raise IllegalAction("Last card is not this one.")
+
+    if CARD_COLORS[card_id] != WILD:
+        raise ValueError("Last card in deck is not a Wild card")
+
+    return state.replace(wild_color=new_color)
+
+
+def draw_card(state: GameState, player_id) -> GameState:
+    seat = get_seat(state, player_id)
+    player = state.players[seat]
+
+    if seat != state.current_player_index:
+        raise IllegalAction("Not the player's turn")
+    if player.has_played_card:
+        raise IllegalAction("Player has already played a card")
+
+    state = state.replace()
+    players = list(state.players)
+    draw_into(state, players, seat, 1)
+    return end_turn(state, players)
+
+
+def say_uno(state: GameState, player_id) -> GameState:
+    seat = get_seat(state, player_id)
+    player = state.players[seat]
+
+    if player.has_said_uno:
+        raise IllegalAction("Player has already called UNO")
+
+    if len(player.hand) != 2:
+        raise IllegalAction("Player cannot call UNO unless they have exactly two cards")
+
+    return set_player(state, seat, player.replace(has_said_uno=True))
+
+
+def activate_cheat_code(state: GameState, player_id, game_cheat: GameCheat) -> GameState:
+    if not state.players:
+        raise IllegalAction("Game has not started yet")
+
+    seat = get_seat(state, player_id)
+
+    if game_cheat == GameCheat.GIVE_WILD_FOUR:
+        face = "Wild Draw Four"
+    elif game_cheat == GameCheat.GIVE_WILD_EIGHT:
+        face = "Wild Draw Eight"
+    else:
+        raise IllegalAction("Invalid cheat code")
+
+    card_ids = CHEAT_CARD_IDS[face]
+    issued = state.cheat_counts.get(face, 0)
+    if issued >= len(card_ids):
+        raise IllegalAction("No more cheat cards available")
+
+    state = set_player(state, seat, state.players[seat].add_card(card_ids[issued]))
+    state.cheat_counts = {**state.cheat_counts, face: issued + 1}
+    return state
+
+
+TRANSITIONS: Dict[EventType, Callable[..., GameState]] = {
+    EventType.START_GAME: start_game,
+    EventType.PLAY_CARD: play_card,
+    EventType.CHANGE_WILD_COLOR: change_wild_card_color,
+    EventType.DRAW_CARD: draw_card,
+    EventType.SAY_UNO: say_uno,
+    EventType.CHEAT: activate_cheat_code,
+}
+
+
+def apply(state: GameState, action: Action) -> GameState:
+    transition = TRANSITIONS.get(action[0])
+    if transition is None:
+        raise ValueError(f"Unknown action: {action[0]}")
+    return transition(state, *action[1:])
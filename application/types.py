@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntEnum
 from typing import TypeVar, Generic
 
 # Defineeri generiline tüüp T
@@ -20,4 +20,13 @@ class Result(Generic[T]):
 
 class GameCheat(Enum):
     GIVE_WILD_FOUR = "giveWildFour"
-    GIVE_WILD_EIGHT = "giveWildEight"
\ No newline at end of file
+    GIVE_WILD_EIGHT = "giveWildEight"
+
+class EventType(IntEnum):
+    START_GAME = 1
+    PLAY_CARD = 2
+    CHANGE_WILD_COLOR = 3
+    DRAW_CARD = 4
+    SAY_UNO = 5
+    CHEAT = 6
+    SNAPSHOT = 7
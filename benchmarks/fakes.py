@@ -0,0 +1,197 @@
+"""Offline stand-ins for the discord.py objects GameUI talks to."""
+import asyncio
+import itertools
+import time
+from collections import defaultdict, deque
+from types import SimpleNamespace
+from typing import Any, Deque, Dict, List, Optional
+
+_ids = itertools.count(10 ** 17)  # Discordi id-de suurused, väikesed id-d on bottidel
+
+
+class FakeHTTPClient:
+    """Stands in for Discord's REST API: optional latency and a rate limit per route.
+
+    By default a limited request raises discord.RateLimited. With
+    `wait_on_limit` it waits for the bucket like discord.py does for 429s.
+    """
+
+    def __init__(self, limit: int = 5, per: float = 5.0, latency: float = 0.0, wait_on_limit: bool = False):
+        self.limit = limit
+        self.per = per
+        self.latency = latency
+        self.wait_on_limit = wait_on_limit
+        self.calls: Dict[str, Deque[float]] = defaultdict(deque)
+        self.requests = 0
+        self.rate_limited = 0
+
+    async def request(self, route: str) -> None:
+        import discord
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        while True:
+            now = time.monotonic()
+            window = self.calls[route]
+            while window and window[0] <= now - self.per:
+                window.popleft()
+            if len(window) < self.limit:
+                break
+            self.rate_limited += 1
+            if not self.wait_on_limit:
+                raise discord.RateLimited(window[0] + self.per - now)
+            await asyncio.sleep(window[0] + self.per - now)
+
+        window.append(now)
+        self.requests += 1
+
+
+class FakeGuild:
+    def __init__(self, id: Optional[int] = None):
+        self.id = id if id is not None else next(_ids)
+
+
+class FakeChannel:
+    def __init__(self, id: Optional[int] = None, http: Optional[FakeHTTPClient] = None):
+        self.id = id if id is not None else next(_ids)
+        self.http = http
+        self.sent: List[Dict[str, Any]] = []
+
+    async def send(self, content=None, **kwargs):
+        if self.http is not None:
+            await self.http.request(f"POST /channels/{self.id}/messages")
+        self.sent.append({"content": content, **kwargs})
+        return FakeMessage(self, self.http)
+
+    async def delete_messages(self, messages):
+        if self.http is not None:
+            await self.http.request(f"POST /channels/{self.id}/messages/bulk-delete")
+        for message in messages:
+            message.deleted = True
+
+
+class FakeMember:
+    def __init__(self, name: str, id: Optional[int] = None):
+        self.id = id if id is not None else next(_ids)
+        self.name = name
+        self.mention = f"<@{self.id}>"
+
+    def __str__(self):
+        return self.name
+
+
+class FakeMessage:
+    def __init__(self, channel: Optional[FakeChannel] = None, http: Optional[FakeHTTPClient] = None,
+                 ephemeral: bool = False, delete_route: Optional[str] = None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.http = http
+        self.flags = SimpleNamespace(ephemeral=ephemeral)
+        # Discordis on kustutamisel kanali kohta oma limiit, followupidel interaktsiooni kohta
+        self.delete_route = delete_route or f"DELETE /channels/{channel.id if channel else None}/messages"
+        self.edits: List[Dict[str, Any]] = []
+        self.attachments: List[Any] = []
+        self.deleted = False
+
+    async def edit(self, **kwargs):
+        if self.http is not None:
+            await self.http.request(f"PATCH /messages/{self.id}")
+        self.edits.append(kwargs)
+        return self
+
+    async def delete(self):
+        if self.http is not None:
+            await self.http.request(self.delete_route)
+        self.deleted = True
+
+
+class FakeResponse:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self.sent: List[Dict[str, Any]] = []
+        self.deferred = False
+
+    def is_done(self) -> bool:
+        return self.deferred or bool(self.sent)
+
+    async def send_message(self, content=None, **kwargs):
+        if self.is_done():
+            raise RuntimeError("This interaction has already been responded to before")
+        self.sent.append({"content": content, **kwargs})
+        await self.interaction.request("POST /interactions/callback")
+        self.interaction.original_message = FakeMessage(self.interaction.channel, self.interaction.http)
+
+    async def defer(self, **kwargs):
+        if self.is_done():
+            raise RuntimeError("This interaction has already been responded to before")
+        self.deferred = True
+        await self.interaction.request("POST /interactions/callback")
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction"):
+        self.interaction = interaction
+        self.sent: List[Dict[str, Any]] = []
+
+    async def send(self, content=None, **kwargs):
+        if not self.interaction.response.is_done():
+            raise RuntimeError("Followups need a response first")
+        self.sent.append({"content": content, **kwargs})
+        await self.interaction.request("POST /webhooks/followup")
+        return FakeMessage(self.interaction.channel, self.interaction.http, kwargs.get("ephemeral", False),
+                           f"DELETE /webhooks/followup/{self.interaction.id}")
+
+
+class FakeInteraction:
+    def __init__(self, user: FakeMember, channel: FakeChannel, guild: Optional[FakeGuild] = None,
+                 message: Optional[FakeMessage] = None, custom_id: Optional[str] = None,
+                 http: Optional[FakeHTTPClient] = None):
+        import discord
+
+        self.id = next(_ids)
+        self.type = discord.InteractionType.component
+        self.http = http
+        self.user = user
+        self.channel = channel
+        self.guild = guild
+        self.message = message
+        self.data = {"custom_id": custom_id} if custom_id is not None else {}
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.original_message: Optional[FakeMessage] = None
+        self.deleted_original = False
+        self.original_edits: List[Dict[str, Any]] = []
+
+    async def original_response(self) -> FakeMessage:
+        if self.original_message is None:
+            raise ValueError("Interaction has not been responded to")
+        return self.original_message
+
+    async def request(self, route: str) -> None:
+        # Interaktsiooni vastustel on Discordis oma limiit iga interaktsiooni kohta
+        if self.http is not None:
+            await self.http.request(f"{route}/{self.id}")
+
+    async def edit_original_response(self, **kwargs):
+        await self.request("PATCH /webhooks/messages/@original")
+        self.original_edits.append(kwargs)
+
+    async def delete_original_response(self):
+        await self.request("DELETE /webhooks/messages/@original")
+        self.deleted_original = True
+
+
+class FakeContext:
+    """Stands in for commands.Context of a prefix command like !uno: no response, no followups."""
+
+    def __init__(self, author: FakeMember, channel: FakeChannel, guild: Optional[FakeGuild] = None,
+                 content: str = ""):
+        self.author = author
+        self.channel = channel
+        self.guild = guild
+        self.message = FakeMessage(channel, channel.http)  # Kasutaja käsusõnum
+        self.message.content = content
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
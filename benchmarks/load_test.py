@@ -0,0 +1,229 @@
+"""Load test: many concurrent games driven through GameCommands against a fake Discord.
+
+    python -m benchmarks.load_test                          # 250 games of 4 players
+    python -m benchmarks.load_test --games 1000 --latency 0.1
+    python -m benchmarks.load_test --games 100 --memory     # also measure memory per game with tracemalloc
+
+Every player is simulated: lobbies are created with !uno, players join,
+the host starts the game and the players take turns with clicks on the
+same buttons real users press (cards, wild colors, draw, UNO, show cards,
+now and then a click out of turn or a !code cheat). The !uno and !code
+commands get a FakeContext like prefix commands get a commands.Context.
+REST calls go through FakeHTTPClient, which adds latency and waits out
+per-route rate limits like discord.py.
+
+Each click reports two latencies: "ack" until the interaction is deferred
+and queued, which Discord needs within 3 seconds, and "done" until the
+game's action queue has applied it and sent the replies.
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from application.bot_player import heuristic_move
+from application.types import GameCheat
+from benchmarks.fakes import FakeChannel, FakeContext, FakeGuild, FakeHTTPClient, FakeInteraction, FakeMember
+from commands.cleanup import cleanup
+from commands.game_commands import GameCommands
+from commands.game_sessions import get_session_key
+from commands.hand_images import hand_images
+from commands.outbound import outbound
+
+CHEAT_CODES = [cheat.value for cheat in GameCheat]
+
+
+def get_percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def get_route_name(custom_id: str) -> str:
+    prefix, _, rest = custom_id.partition("-")
+    return f"{prefix}-*" if prefix in ("card", "color") else custom_id
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.http = FakeHTTPClient(args.rate_limit, args.rate_period, args.latency, wait_on_limit=True)
+        self.cog = GameCommands(None)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.done_latencies: Dict[str, List[float]] = defaultdict(list)
+        self.loop_lags: List[float] = []
+        self.peak_queue_depth: Dict[str, int] = defaultdict(int)
+        self.finished = 0
+        self.peak_memory = 0
+
+    async def think(self) -> None:
+        await asyncio.sleep(self.rng.expovariate(1 / self.args.think_time))
+
+    async def click(self, game, member, channel, guild, message, custom_id: str) -> None:
+        interaction = FakeInteraction(member, channel, guild, message, custom_id, self.http)
+        route = get_route_name(custom_id)
+        started = time.perf_counter()
+        await self.cog.on_interaction(interaction)
+        self.latencies[route].append(time.perf_counter() - started)
+        # Mängija näeb tulemust alles siis, kui mängu järjekord on klõpsu ära teinud
+        await game.actions.drain()
+        self.done_latencies[route].append(time.perf_counter() - started)
+
+    async def enter_cheat_code(self, member, channel, guild, code: str) -> None:
+        started = time.perf_counter()
+        await GameCommands.cheat_code.callback(self.cog, FakeContext(member, channel, guild, f"!code {code}"), code)
+        self.latencies["!code"].append(time.perf_counter() - started)
+        self.done_latencies["!code"].append(time.perf_counter() - started)
+
+    async def run_game(self, index: int) -> None:
+        await asyncio.sleep(self.rng.uniform(0, self.args.ramp_up))
+
+        guild = FakeGuild()
+        channel = FakeChannel(http=self.http)
+        members = [FakeMember(f"player-{index}-{seat}") for seat in range(self.args.players)]
+        host = members[0]
+
+        ctx = FakeContext(host, channel, guild, "!uno")
+        started = time.perf_counter()
+        await GameCommands.start.callback(self.cog, ctx)
+        self.latencies["!uno"].append(time.perf_counter() - started)
+        self.done_latencies["!uno"].append(time.perf_counter() - started)
+
+        game = self.cog.sessions.get(get_session_key(ctx))
+        message = game.message
+        for member in members[1:]:
+            await self.think()
+            await self.click(game, member, channel, guild, message, "join-btn")
+        await self.click(game, host, channel, guild, message, "start-btn")
+
+        members_by_id = {member.id: member for member in members}
+        for _ in range(self.args.max_turns):
+            if not game.is_started():
+                self.finished += 1
+                return
+            await self.think()
+
+            player = game.game_logic.get_current_player()
+            member = members_by_id[player.id]
+            if self.rng.random() < self.args.show_cards_rate:
+                await self.click(game, member, channel, guild, message, "show-cards-btn")
+            if self.rng.random() < self.args.wrong_turn_rate:
+                other = self.rng.choice([other for other in members if other is not member])
+                await self.click(game, other, channel, guild, message, "draw-card-btn")
+            if self.rng.random() < self.args.cheat_rate:
+                await self.enter_cheat_code(member, channel, guild, self.rng.choice(CHEAT_CODES))
+
+            move = heuristic_move(game.game_logic, player.id)
+            if move is None:
+                await self.click(game, member, channel, guild, message, "draw-card-btn")
+                continue
+
+            card_id, color = move
+            if len(player.hand) == 2:
+                await self.click(game, member, channel, guild, message, "say-uno-btn")
+            # Kaardinupud on ephemeral sõnumites, mäng leitakse kanali järgi
+            await self.click(game, member, channel, guild, None, f"card-{card_id}")
+            if color is not None:
+                await self.click(game, member, channel, guild, None, f"color-{color}-{card_id}")
+
+        game.close_game()  # Liiga pikk mäng, lõpetame
+
+    async def measure_loop_lag(self, interval: float = 0.05) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self.loop_lags.append(max(0.0, loop.time() - expected))
+            for priority, depth in outbound.get_queue_depth().items():
+                self.peak_queue_depth[priority] = max(self.peak_queue_depth[priority], depth)
+            if self.args.memory:
+                self.peak_memory = max(self.peak_memory, tracemalloc.get_traced_memory()[0])
+
+    async def run(self) -> float:
+        lag_task = asyncio.get_running_loop().create_task(self.measure_loop_lag())
+        started = time.perf_counter()
+        await asyncio.gather(*(self.run_game(index) for index in range(self.args.games)))
+        elapsed = time.perf_counter() - started
+        lag_task.cancel()
+        await cleanup.flush()
+        hand_images.shutdown()
+        return elapsed
+
+    @staticmethod
+    def format_row(route: str, values: List[float], done: List[float]) -> str:
+        return (f"{route:<18}{len(values):>8}{get_percentile(values, 50) * 1000:>10.2f}"
+                f"{get_percentile(values, 99) * 1000:>10.2f}{max(values, default=0) * 1000:>10.2f}"
+                f"{get_percentile(done, 50) * 1000:>10.2f}{get_percentile(done, 99) * 1000:>10.2f}")
+
+    def report(self, elapsed: float, memory_per_game: float, memory_source: str) -> str:
+        interactions = sum(len(values) for values in self.latencies.values())
+        lines = [
+            f"games: {self.args.games} ({self.finished} finished), players: {self.args.games * self.args.players}",
+            f"interactions: {interactions} in {elapsed:.1f} s ({interactions / elapsed:.0f}/s)",
+            "",
+            f"{'route':<18}{'calls':>8}{'ack p50':>10}{'ack p99':>10}{'ack max':>10}{'done p50':>10}{'done p99':>10}",
+        ]
+        all_latencies, all_done = [], []
+        for route, values in sorted(self.latencies.items()):
+            done = self.done_latencies[route]
+            all_latencies.extend(values)
+            all_done.extend(done)
+            lines.append(self.format_row(route, values, done))
+        lines.append(self.format_row("all", all_latencies, all_done))
+        lines.append("(milliseconds)")
+        lines += [
+            "",
+            f"event loop lag: p50 {get_percentile(self.loop_lags, 50) * 1000:.2f} ms, "
+            f"p99 {get_percentile(self.loop_lags, 99) * 1000:.2f} ms, max {max(self.loop_lags, default=0) * 1000:.2f} ms",
+            f"REST requests: {self.http.requests}, rate limited: {self.http.rate_limited}",
+            "peak outbound queue: " + ", ".join(f"{priority} {depth}" for priority, depth in self.peak_queue_depth.items()),
+            f"memory per game: {memory_per_game / 1024:.1f} KiB ({memory_source})",
+        ]
+        return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drive concurrent UNO games through a fake Discord.")
+    parser.add_argument("--games", type=int, default=250)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="REST round trip in seconds")
+    parser.add_argument("--rate-limit", type=int, default=5, help="requests per route per --rate-period")
+    parser.add_argument("--rate-period", type=float, default=5.0)
+    parser.add_argument("--think-time", type=float, default=0.2, help="mean seconds between a player's clicks")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="games start spread over this many seconds")
+    parser.add_argument("--max-turns", type=int, default=500)
+    parser.add_argument("--show-cards-rate", type=float, default=0.1)
+    parser.add_argument("--wrong-turn-rate", type=float, default=0.05)
+    parser.add_argument("--cheat-rate", type=float, default=0.01, help="chance per turn of a !code cheat")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory", action="store_true", help="trace allocations (slows the run down)")
+    args = parser.parse_args()
+
+    if args.memory:
+        tracemalloc.start()
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    load_test = LoadTest(args)
+    elapsed = asyncio.run(load_test.run())
+
+    if args.memory:
+        memory_per_game, memory_source = load_test.peak_memory / args.games, "tracemalloc peak"
+    else:
+        # ru_maxrss on Linuxis kilobaitides
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory_per_game, memory_source = (peak_rss - baseline_rss) * 1024 / args.games, "peak RSS growth"
+    print(load_test.report(elapsed, memory_per_game, memory_source))
+
+
+if __name__ == "__main__":
+    main()
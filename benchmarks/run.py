@@ -0,0 +1,381 @@
+"""Benchmarks for the game engine and the status message rendering.
+
+    python -m benchmarks.run                  # run and compare with benchmarks/baseline.json
+    python -m benchmarks.run --save           # run and store the results as the new baseline for this host
+    python -m benchmarks.run --filter logic   # run only benchmarks whose name contains "logic"
+
+Every round times a tight loop of many calls, like timeit, with the setup
+of all calls done before the clock starts. Right before it the same round
+times a fixed pure Python reference loop, and the benchmark is compared by
+its median ratio to that loop. A machine that is slower or faster as a
+whole, e.g. a shared VM, changes both and leaves the ratio. A benchmark
+counts as slower only when its ratio grew by more than --threshold and by
+more than --noise times the spread of the rounds (the median absolute
+deviation, scaled like a standard deviation).
+
+The baseline records the host it was measured on. On the same host the
+comparison exits with status 1 when a benchmark got slower, or when there
+is no baseline to compare with, so it can gate a deploy. On another host the
+numbers are only printed; save a baseline there with --save to gate on it.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from application.deck import Deck, shuffle
+from application.game_logic import GameLogic
+from application.transitions import apply, create_cards, distribute_cards, new_bulk_rng
+from application.types import EventType
+from benchmarks.fakes import FakeMember, FakeMessage
+from common.types import Player
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def get_host() -> Dict[str, object]:
+    """What the timings depend on; a baseline only gates runs on the same host."""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as file:
+            cpu = next((line.split(":", 1)[1].strip() for line in file if line.startswith("model name")), cpu)
+    except OSError:
+        pass
+    return {
+        "machine": platform.machine(),
+        "cpu": cpu,
+        "cpus": os.cpu_count(),
+        "python": f"{platform.python_implementation()} {platform.python_version()}",
+    }
+
+
+BENCHMARKS: Dict[str, "Benchmark"] = {}
+
+
+class Benchmark:
+    def __init__(self, name: str, func: Callable, setup: Optional[Callable] = None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+
+    def time_calls(self, calls: int) -> int:
+        # Kõigi kutsete setup tehakse enne kella käivitamist, mõõdetakse ainult tihedat tsüklit
+        batch = [self.setup() if self.setup else () for _ in range(calls)]
+        func = self.func
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            started = time.perf_counter_ns()
+            for args in batch:
+                func(*args)
+            return time.perf_counter_ns() - started
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def calibrate(self, iterations: int, min_time_ns: int = 5_000_000, max_calls: int = 20_000) -> int:
+        """Calls per round: at least `iterations` and enough to last `min_time_ns`."""
+        # Soojendusring annab ka hinnangu, mitu kutset ühte ringi mahub
+        elapsed = self.time_calls(iterations)
+        return min(max_calls, max(iterations, math.ceil(iterations * min_time_ns / max(elapsed, 1))))
+
+
+def reference_loop():
+    # Tavaline Pythoni töö: tsükkel, täisarvud, dict ja baidid
+    counts = {}
+    for value in range(200):
+        key = value & 15
+        counts[key] = counts.get(key, 0) + value * value
+    return bytes(range(64))[::-1]
+
+
+REFERENCE = Benchmark("reference", reference_loop)
+
+
+def benchmark(name: str, setup: Optional[Callable] = None):
+    def decorator(func):
+        BENCHMARKS[name] = Benchmark(name, func, setup)
+        return func
+    return decorator
+
+
+def new_game(player_count: int = 4) -> GameLogic:
+    game_logic = GameLogic()
+    game_logic.start_game(list(range(player_count)))
+    return game_logic
+
+
+def game_with_playable_card():
+    game_logic = new_game()
+    player = game_logic.get_current_player()
+    return game_logic, player.id, player.hand[0]
+
+
+def discard_top_card(game_logic: GameLogic) -> None:
+    deck, cards = game_logic.game_state.deck.draw_n(1)
+    game_logic.game_state = game_logic.game_state.replace(deck=deck.discard(cards[0]))
+
+
+def game_with_empty_deck():
+    game_logic = new_game()
+    deck = game_logic.game_state.deck
+    game_logic.game_state = game_logic.game_state.replace(
+        deck=Deck.from_piles((), deck.get_discard_pile() + deck.get_draw_pile()))
+    return game_logic, game_logic.get_current_player()
+
+
+def player_with_full_hand():
+    game_logic = new_game()
+    player = game_logic.get_current_player()
+    game_logic.draw_cards(player, 18)
+    discard_top_card(game_logic)
+    return game_logic, player.id, game_logic.get_player_cards(player.id)
+
+
+@benchmark("cards.create_cards")
+def bench_create_cards():
+    create_cards()
+
+
+@benchmark("cards.shuffle", setup=lambda: (create_cards(),))
+def bench_shuffle(cards):
+    shuffle(cards)
+
+
+@benchmark("cards.shuffle_numpy", setup=lambda: (create_cards(), new_bulk_rng(0)))
+def bench_shuffle_numpy(cards, rng):
+    shuffle(cards, rng)
+
+
+@benchmark("cards.distribute_cards", setup=lambda: ([Player(pid) for pid in range(4)], Deck.from_piles(shuffle(create_cards()))))
+def bench_distribute_cards(players, deck):
+    distribute_cards(players, deck)
+
+
+@benchmark("cards.deck_draw_n", setup=lambda: (Deck.from_piles(shuffle(create_cards())),))
+def bench_deck_draw_n(deck):
+    deck.draw_n(8)
+
+
+@benchmark("logic.start_game", setup=lambda: (GameLogic(),))
+def bench_start_game(game_logic):
+    game_logic.start_game(list(range(4)))
+
+
+@benchmark("logic.play_card", setup=game_with_playable_card)
+def bench_play_card(game_logic, player_id, card_id):
+    game_logic.play_card(player_id, card_id)
+
+
+@benchmark("logic.apply_play_card", setup=game_with_playable_card)
+def bench_apply_play_card(game_logic, player_id, card_id):
+    # Sama olek jääb alles, nagu otsingu harus või tagasivõtmise jaoks
+    apply(game_logic.game_state, (EventType.PLAY_CARD, player_id, card_id))
+
+
+@benchmark("logic.draw_card", setup=lambda: (new_game(),))
+def bench_draw_card(game_logic):
+    game_logic.draw_card(game_logic.get_current_player().id)
+
+
+@benchmark("logic.next_turn", setup=lambda: (new_game(),))
+def bench_next_turn(game_logic):
+    game_logic.next_turn()
+
+
+@benchmark("logic.draw_cards_reshuffle", setup=game_with_empty_deck)
+def bench_draw_cards_reshuffle(game_logic, player):
+    game_logic.draw_cards(player, 1)
+
+
+@benchmark("logic.can_play_card_full_hand", setup=player_with_full_hand)
+def bench_can_play_card_full_hand(game_logic, player_id, cards):
+    for card in cards:
+        game_logic.can_play_card(card, player_id)
+
+
+@benchmark("logic.playable_cards_full_hand", setup=player_with_full_hand)
+def bench_playable_cards_full_hand(game_logic, player_id, cards):
+    game_logic.playable_cards(player_id)
+
+
+@benchmark("ui.route_custom_ids")
+def bench_route_custom_ids():
+    from commands.game_commands import router
+
+    for custom_id in ("join-btn", "card-17", "color-Red-102", "leave-btn"):
+        router.resolve(custom_id)
+
+
+def game_ui_with_started_game():
+    from commands.game_ui import GameUI
+
+    game_ui = GameUI()
+    game_ui.message = FakeMessage()
+    game_ui.players = [FakeMember(f"player-{index}", index) for index in range(4)]
+    game_ui.initiator = game_ui.players[0]
+    game_ui.game_logic = new_game()
+    discard_top_card(game_ui.game_logic)
+    game_ui.last_player = game_ui.players[0]
+    return game_ui,
+
+
+def game_ui_after_draw():
+    game_ui, = game_ui_with_started_game()
+    game_ui.get_game_message_content()
+    game_ui.game_logic.draw_card(game_ui.game_logic.get_current_player().id)
+    return game_ui,
+
+
+@benchmark("ui.get_game_message_content", setup=game_ui_with_started_game)
+def bench_get_game_message_content(game_ui):
+    game_ui.get_game_message_content()
+
+
+@benchmark("ui.get_game_message_content_after_draw", setup=game_ui_after_draw)
+def bench_get_game_message_content_after_draw(game_ui):
+    game_ui.get_game_message_content()
+
+
+def game_ui_with_large_hand():
+    game_ui, = game_ui_with_started_game()
+    player = game_ui.game_logic.get_current_player()
+    game_ui.game_logic.draw_cards(player, 30)
+    return game_ui, player.id
+
+
+def game_ui_with_shown_hand_after_draw():
+    game_ui, player_id = game_ui_with_large_hand()
+    game_ui.get_hand_pages(player_id)
+    game_ui.game_logic.draw_cards(game_ui.game_logic.get_player(player_id), 1)
+    return game_ui, player_id
+
+
+@benchmark("ui.hand_pages_build", setup=game_ui_with_large_hand)
+def bench_hand_pages_build(game_ui, player_id):
+    game_ui.get_hand_pages(player_id)
+
+
+@benchmark("ui.hand_pages_after_draw", setup=game_ui_with_shown_hand_after_draw)
+def bench_hand_pages_after_draw(game_ui, player_id):
+    game_ui.get_hand_pages(player_id)
+
+
+def run_benchmarks(names: List[str], rounds: int, iterations: int) -> Dict[str, Dict[str, float]]:
+    async def run_all():
+        # discord.ui.View vajab töötavat event loopi
+        reference_calls = REFERENCE.calibrate(iterations)
+        calls = {name: BENCHMARKS[name].calibrate(iterations) for name in names}
+        timings: Dict[str, List[float]] = {name: [] for name in names}
+        ratios: Dict[str, List[float]] = {name: [] for name in names}
+        # Ringid käivad kõigi benchmarkide vahel vaheldumisi ja iga mõõtmise kõrval on võrdlustsükkel
+        for _ in range(rounds):
+            for name in names:
+                reference = REFERENCE.time_calls(reference_calls) / reference_calls
+                timing = BENCHMARKS[name].time_calls(calls[name]) / calls[name]
+                timings[name].append(timing)
+                ratios[name].append(timing / reference)
+
+        return {name: {
+            "median_ns": statistics.median(timings[name]),
+            "relative": statistics.median(ratios[name]),
+            "relative_mad": get_mad(ratios[name]),
+        } for name in names}
+
+    return asyncio.run(run_all())
+
+
+def get_mad(values: List[float]) -> float:
+    # Hajuvus mediaani ümber standardhälbe mõõdus, üksikud aeglased ringid seda ei paisuta
+    median = statistics.median(values)
+    return statistics.median(abs(value - median) for value in values) * 1.4826
+
+
+def format_ns(value: float) -> str:
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:.2f} ms"
+    if value >= 1_000:
+        return f"{value / 1_000:.2f} us"
+    return f"{value:.0f} ns"
+
+
+def get_tolerance(result: Dict[str, float], previous: Dict[str, float], threshold: float, noise: float) -> float:
+    # Mõlema mõõtmise hajuvus kokku, suhtena baseline'i väärtusse
+    spread = math.hypot(result["relative_mad"], previous["relative_mad"]) / previous["relative"]
+    return max(threshold, noise * spread)
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float,
+            noise: float) -> bool:
+    regressed = False
+    print(f"{'benchmark':<36} {'baseline':>12} {'current':>12} {'change':>9} {'allowed':>9}")
+    for name, result in results.items():
+        current = result["median_ns"]
+        if name not in baseline:
+            print(f"{name:<36} {'-':>12} {format_ns(current):>12} {'new':>9}")
+            continue
+
+        previous = baseline[name]
+        change = result["relative"] / previous["relative"] - 1
+        tolerance = get_tolerance(result, previous, threshold, noise)
+        marker = ""
+        if change > tolerance:
+            marker = "  REGRESSION"
+            regressed = True
+        print(f"{name:<36} {format_ns(previous['median_ns']):>12} {format_ns(current):>12} {change:>+8.1%} "
+              f"{tolerance:>+8.1%}{marker}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run UNO bot benchmarks")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown before failing, 0.2 = 20%%")
+    parser.add_argument("--noise", type=float, default=3.0,
+                        help="Allowed slowdown in standard deviations of the rounds, when more than --threshold")
+    args = parser.parse_args()
+
+    baseline = {"host": None, "results": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    elif not args.save:
+        # Ilma baseline'ita poleks millegagi võrrelda ja iga tulemus läheks läbi
+        sys.exit(f"No baseline at {args.baseline}, create it with --save")
+
+    host = get_host()
+    same_host = baseline.get("host") == host
+    if not same_host:
+        print(f"Baseline was measured on {baseline.get('host')}, this is {host}: not gating")
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_benchmarks(names, args.rounds, args.iterations)
+
+    regressed = compare(results, baseline.get("results", {}), args.threshold, args.noise)
+
+    if args.save:
+        # Teise masina tulemustega ei saa võrrelda, neid ei segata kokku
+        previous = baseline["results"] if same_host else {}
+        baseline = {"host": host, "results": {**previous, **results}}
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.baseline}")
+    elif regressed and same_host:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, Tuple
+
+Action = Callable[[], Awaitable]
+
+logger = logging.getLogger(__name__)
+
+
+class ActionQueue:
+    """Runs one game's actions strictly one after another, in arrival order.
+
+    Interactions are acknowledged before they are queued, so an action may
+    take as long as it needs without missing Discord's deadline. Every game
+    has its own queue and worker task, so a slow game never holds up another.
+    """
+
+    def __init__(self, max_size: int = 100):
+        self.max_size = max_size
+        self.pending: Deque[Tuple[Action, contextvars.Context, Optional[asyncio.Future]]] = deque()
+        self.task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def submit(self, action: Action, future: Optional[asyncio.Future] = None) -> bool:
+        if len(self.pending) >= self.max_size:
+            return False  # Keegi klõpsab nii kiiresti, et järjekord on täis
+
+        # Tegevus jookseb oma kontekstis, et tracing näeks õiget interaktsiooni
+        self.pending.append((action, contextvars.copy_context(), future))
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return True
+
+    async def call(self, action: Action):
+        """Queues an action and waits for its result."""
+        future = asyncio.get_running_loop().create_future()
+        if not self.submit(action, future):
+            raise RuntimeError("Action queue is full")
+        return await future
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self.pending:
+            action, context, future = self.pending.popleft()
+            try:
+                result = await loop.create_task(action(), context=context)
+            except asyncio.CancelledError:
+                if future is not None and not future.done():
+                    future.cancel()
+                raise
+            except Exception as error:
+                if future is not None and not future.done():
+                    future.set_exception(error)
+                else:
+                    logger.exception("Game action failed")
+            else:
+                if future is not None and not future.done():
+                    future.set_result(result)
+
+    async def drain(self) -> None:
+        """Waits until every queued action has run."""
+        while self.task is not None and not self.task.done():
+            await asyncio.wait({self.task})
+
+    def clear(self) -> None:
+        # Mäng suleti, ootel tegevusi enam ei tehta
+        while self.pending:
+            _, _, future = self.pending.popleft()
+            if future is not None and not future.done():
+                future.cancel()
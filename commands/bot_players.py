@@ -0,0 +1,82 @@
+import asyncio
+import os
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from application.bot_player import Move, heuristic_move, search_move_from_state
+from application.game_logic import GameLogic
+from application.state_codec import encode_state
+
+
+class BotMember:
+    """Stands in for a discord.Member in GameUI.players."""
+
+    bot = True
+
+    def __init__(self, bot_id: int):
+        self.id = bot_id
+        self.name = f"UNO Bot {bot_id}"
+        self.display_name = self.name
+        self.mention = f"**{self.name}**"
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, BotMember) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+class BotMoveSearcher:
+    """Runs bot move searches in a process pool so the event loop never waits on them.
+
+    Every search gets `time_budget` seconds of CPU in a worker. When more
+    searches are queued than there are workers, the budget is shared so a
+    bot's turn still takes about `time_budget` of wall time.
+    """
+
+    def __init__(self, time_budget: float = 0.5, executor: Optional[Executor] = None,
+                 max_workers: Optional[int] = None):
+        self.time_budget = time_budget
+        self.executor = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.pending = 0
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.executor
+
+    def get_budget(self) -> float:
+        # Järjekorras ootavad otsingud jagavad töötajaid, seega lühendame igaühe aega
+        return self.time_budget * min(1.0, self.max_workers / max(1, self.pending))
+
+    async def choose_move(self, game_logic: GameLogic, player_id: int) -> Move:
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            budget = self.get_budget()
+            future = loop.run_in_executor(self.get_executor(), search_move_from_state,
+                                          encode_state(game_logic.game_state), player_id, budget,
+                                          random.getrandbits(64))
+            return await asyncio.wait_for(future, budget + 2.0)
+        except asyncio.TimeoutError:
+            # Otsing ei jõudnud õigel ajal valmis, käime heuristika järgi
+            return heuristic_move(game_logic, player_id)
+        except BrokenProcessPool:
+            self.executor = None  # Järgmine otsing loob uue protsessipooli
+            return heuristic_move(game_logic, player_id)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+bot_moves = BotMoveSearcher()
@@ -0,0 +1,138 @@
+import asyncio
+import io
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+from application.cards import COLORS, KINDS, WILD
+from common.types import Card
+
+CardKey = Tuple[str, str]  # (color, face)
+
+BASE_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "images", "cards")
+DISCORD_MAX_FILES = 10
+
+
+def get_image_filename(color: str, face: str) -> str:
+    return f"card-{color.lower()}-{face.lower().replace(' ', '_')}.png"
+
+
+# Pildid on olemas ainult värviga kaartidel, ka Wild kaartidel pärast värvi valimist
+IMAGE_FILENAMES: Dict[CardKey, str] = {
+    (color, face): get_image_filename(color, face)
+    for color in COLORS
+    for face in dict.fromkeys(face for _, face in KINDS)
+}
+
+
+class CardAssets:
+    # Discordi CDN lingid on allkirjastatud ja aeguvad, seega kasutame neid piiratud aja
+    url_ttl = 12 * 60 * 60
+    # Pildid laetakse uuesti üles enne linkide aegumist, et vahepeal ei peaks faile manustama
+    refresh_after = 9 * 60 * 60
+    retry_delay = 5 * 60
+
+    def __init__(self, base_path: str = BASE_PATH):
+        self.base_path = base_path
+        self.images: Dict[CardKey, bytes] = {}
+        self.urls: Dict[CardKey, Tuple[str, float]] = {}
+        self.channel: Optional[discord.abc.Messageable] = None  # Asset channel, set by upload_all()
+        self.upload_task: Optional[asyncio.Task] = None
+        self.retry_at = 0.0
+
+    def is_loaded(self) -> bool:
+        return bool(self.images)
+
+    def load(self) -> None:
+        for key, filename in IMAGE_FILENAMES.items():
+            path = os.path.join(self.base_path, filename)
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    self.images[key] = file.read()
+
+    def get_key(self, card: Card) -> Optional[CardKey]:
+        key = (card.color, card.face)
+        if card.color == WILD or key not in IMAGE_FILENAMES:
+            return None
+        return key
+
+    def get_filename(self, card: Card) -> Optional[str]:
+        key = self.get_key(card)
+        return IMAGE_FILENAMES[key] if key else None
+
+    def get_file(self, card: Card) -> Optional[discord.File]:
+        if not self.images:
+            self.load()
+        key = self.get_key(card)
+        if key is None or key not in self.images:
+            return None
+        return discord.File(io.BytesIO(self.images[key]), filename=IMAGE_FILENAMES[key])
+
+    def get_uploaded_url(self, card: Card) -> Optional[str]:
+        key = self.get_key(card)
+        if key is None or key not in self.images:
+            return None
+        uploaded = self.urls.get(key)
+        if uploaded is None:
+            self.refresh()
+            return None
+        url, uploaded_at = uploaded
+        age = time.monotonic() - uploaded_at
+        if age > self.refresh_after:
+            self.refresh()
+        if age > self.url_ttl:
+            del self.urls[key]
+            return None
+        return url
+
+    def refresh(self) -> None:
+        """Uploads the images with missing or old links again in the background."""
+        if self.channel is None or time.monotonic() < self.retry_at:
+            return
+        if self.upload_task is not None and not self.upload_task.done():
+            return
+        self.upload_task = asyncio.get_running_loop().create_task(self.upload_stale())
+
+    async def upload_stale(self) -> None:
+        now = time.monotonic()
+        keys = [key for key in self.images if key not in self.urls or now - self.urls[key][1] > self.refresh_after]
+        try:
+            await self.upload(self.channel, keys)
+        except discord.HTTPException:
+            self.retry_at = time.monotonic() + self.retry_delay  # Senikaua manustatakse pildifailid
+
+    def get_image_url(self, card: Card) -> Optional[str]:
+        filename = self.get_filename(card)
+        if filename is None:
+            return None
+        return self.get_uploaded_url(card) or f"attachment://{filename}"
+
+    def remember_uploads(self, message: discord.Message) -> None:
+        keys = {filename: key for key, filename in IMAGE_FILENAMES.items()}
+        now = time.monotonic()
+        for attachment in message.attachments:
+            key = keys.get(attachment.filename)
+            if key is not None:
+                self.urls[key] = (attachment.url, now)
+
+    async def upload_all(self, channel: discord.abc.Messageable) -> None:
+        """Uploads every card image to an asset channel so game messages can link to them.
+
+        The channel is kept: links that are about to expire are uploaded there again.
+        """
+        if not self.images:
+            self.load()
+        self.channel = channel
+        await self.upload(channel, list(self.images))
+
+    async def upload(self, channel: discord.abc.Messageable, keys: List[CardKey]) -> None:
+        for start in range(0, len(keys), DISCORD_MAX_FILES):
+            batch: Iterable[CardKey] = keys[start:start + DISCORD_MAX_FILES]
+            files = [discord.File(io.BytesIO(self.images[key]), filename=IMAGE_FILENAMES[key]) for key in batch]
+            message = await channel.send(files=files)
+            self.remember_uploads(message)
+
+
+card_assets = CardAssets()
@@ -0,0 +1,99 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+import discord
+
+Cleanup = Callable[[], Awaitable]
+
+
+class CleanupScheduler:
+    """Runs delayed deletions from one task instead of a sleeping coroutine per reply.
+
+    Handlers call schedule() and return right away. Every due cleanup runs as
+    its own task, at most `max_concurrency` at a time, so one slow delete does
+    not hold back the ones that come due after it. GameUI
+    deletes go through the outbound scheduler, which sets the actual request
+    rate and can only merge deletes it sees queued together.
+    """
+
+    def __init__(self, max_concurrency: int = 100, max_batch: int = 100):
+        self.max_concurrency = max_concurrency
+        self.max_batch = max_batch
+        self.heap: List[Tuple[float, int, Cleanup]] = []
+        self.counter = itertools.count()
+        self.task: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.running: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def schedule(self, cleanup: Cleanup, delay: float) -> None:
+        due = time.monotonic() + delay
+        is_earliest = not self.heap or due < self.heap[0][0]
+        heapq.heappush(self.heap, (due, next(self.counter), cleanup))
+
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        elif is_earliest:
+            self.wakeup.set()
+
+    def pop_due(self) -> List[Cleanup]:
+        now = time.monotonic()
+        due = []
+        while self.heap and self.heap[0][0] <= now and len(due) < self.max_batch:
+            due.append(heapq.heappop(self.heap)[2])
+        return due
+
+    async def run(self) -> None:
+        while True:
+            due = self.pop_due()
+            if due:
+                for cleanup in due:
+                    await self.start_cleanup(cleanup)
+                continue
+
+            self.wakeup.clear()
+            timeout = self.heap[0][0] - time.monotonic() if self.heap else None
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start_cleanup(self, cleanup: Cleanup) -> None:
+        # Ootame ainult vaba kohta, mitte eelmiste kustutamiste lõppu
+        await self.semaphore.acquire()
+        task = asyncio.get_running_loop().create_task(self.run_cleanup(cleanup))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+
+    async def run_cleanup(self, cleanup: Cleanup) -> None:
+        # Koht semaphore'is on võetud enne ülesande loomist
+        try:
+            await cleanup()
+        except discord.HTTPException:
+            pass  # Sõnum on juba kustutatud või interaktsioon aegunud
+        finally:
+            self.semaphore.release()
+
+    async def flush(self) -> None:
+        """Runs every pending cleanup now, e.g. before shutting down."""
+        pending = [cleanup for _, _, cleanup in self.heap]
+        self.heap.clear()
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.semaphore = self.semaphore or asyncio.Semaphore(self.max_concurrency)
+        for cleanup in pending:
+            await self.start_cleanup(cleanup)
+        if self.running:
+            await asyncio.gather(*self.running)
+
+
+cleanup = CleanupScheduler()
@@ -1,48 +1,193 @@
+import asyncio
+import os
+import time
+
 import discord
 from discord.ext import commands
 
-import game_ui
+from application.cards import COLORS, MAX_CARDS
+from application.game_store import GameStore
+from commands.bot_players import bot_moves
+from commands.card_assets import card_assets
+from commands.cleanup import cleanup
+from commands.game_sessions import GameSessions, get_session_key
+from commands.game_ui import GameUI, get_interaction_route
+from commands.hand_images import hand_images
+from commands.hand_view import MAX_PAGES as MAX_HAND_PAGES
+from commands.interaction_router import InteractionRouter
+from commands.metrics import metrics
+from commands.outbound import outbound
+from commands.profiler import profiler
+from commands.tracing import tracer
+
+
+def parse_card_id(rest: str) -> tuple:
+    card_id = int(rest)
+    if not 0 <= card_id < MAX_CARDS:
+        raise ValueError(f"Unknown card: {card_id}")
+    return card_id,
+
+
+def parse_color_selection(rest: str) -> tuple:
+    # "Red-102" -> (102, "Red")
+    color, _, card_id = rest.rpartition("-")
+    if color not in COLORS:
+        raise ValueError(f"Unknown color: {color}")
+    return parse_card_id(card_id) + (color,)
+
+
+def parse_hand_page(rest: str) -> tuple:
+    index = int(rest)
+    if not 0 <= index < MAX_HAND_PAGES:
+        raise ValueError(f"Unknown hand page: {index}")
+    return index,
+
+
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+# Sekundites: nii kaua tegevuseta mäng kirjutatakse mälust kettale, ja pärast seda suletakse
+GAME_IDLE_SOFT_TTL = float(os.getenv("GAME_IDLE_SOFT_TTL", "600"))
+GAME_IDLE_HARD_TTL = float(os.getenv("GAME_IDLE_HARD_TTL", "7200"))
+
+router = InteractionRouter()
+router.add("join-btn", GameUI.join_button)
+router.add("start-btn", GameUI.handle_start_button)
+router.add("add-bot-btn", GameUI.add_bot_button)
+router.add("cancel-btn", GameUI.handle_cancel_button)
+router.add("show-cards-btn", GameUI.handle_show_cards_button)
+router.add("draw-card-btn", GameUI.handle_draw_card_button)
+router.add("say-uno-btn", GameUI.handle_say_uno)
+router.add_prefix("card", GameUI.handle_card_button, parse_card_id)
+router.add_prefix("color", GameUI.handle_color_selection, parse_color_selection)
+router.add_prefix("hand", GameUI.handle_hand_page, parse_hand_page)
+
+
 class GameCommands(commands.Cog):
     def __init__(self, bot):  # kas tohtisin boti siia panna
         self.bot = bot
-        self.game_ui = game_ui.GameUI()
+        store_path = os.getenv("GAME_STORE_PATH")
+        self.sessions = GameSessions(store=GameStore(store_path) if store_path else None)
+        self.eviction_task = None
+        metrics.active_games.collect = lambda: len(self.sessions)
+        metrics.active_players.collect = lambda: sum(len(game.players) for game in self.sessions.by_channel.values())
+        metrics.outbound_queue_depth.collect = lambda: {
+            (priority,): depth for priority, depth in outbound.get_queue_depth().items()
+        }
+
+    async def cog_load(self):
+        card_assets.load()
+        metrics_port = os.getenv("METRICS_PORT")
+        if metrics_port:
+            await metrics.start(int(metrics_port))
+        self.eviction_task = asyncio.get_running_loop().create_task(self.sessions.run_eviction(
+            GAME_IDLE_SOFT_TTL, GAME_IDLE_HARD_TTL, get_channel=self.bot.get_channel if self.bot else None
+        ))
+
+    async def cog_unload(self):
+        if self.eviction_task is not None:
+            self.eviction_task.cancel()
+        await metrics.stop()
+        await cleanup.flush()
+        if self.sessions.store is not None:
+            await self.sessions.store.close()
+        hand_images.shutdown()
+        bot_moves.shutdown()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # Kui kaardipiltide kanal on seadistatud, laeme pildid sinna üles ja kasutame linke;
+        # aeguvad lingid uuendab card_assets ise, on_ready võib ühenduse taastamisel korduda
+        channel_id = os.getenv("CARD_ASSET_CHANNEL_ID")
+        if not channel_id or card_assets.channel is not None:
+            return
+        channel = self.bot.get_channel(int(channel_id))
+        if channel is not None:
+            await card_assets.upload_all(channel)
 
     @commands.command(name="uno", help="Create an UNO lobby")
+    @tracer.traced
     async def start(self, ctx):
-        await self.game_ui.handle_start(ctx)
+        key = get_session_key(ctx)
+        is_new = self.sessions.get(key) is None and await self.sessions.restore(ctx) is None
+        game = self.sessions.create(key)
+        if game is None:
+            await ctx.send("Too many UNO games are in progress. Try again later.")
+            return
+        game.touch()
+
+        await game.handle_start(ctx)
+        if is_new and game.message is not None:
+            self.sessions.bind_message(game)
 
     @commands.command(name="code", help="Enter a cheat code")
+    @tracer.traced
     async def cheat_code(self, ctx, code: str):
-        await self.game_ui.handle_cheat_code(ctx, code)
+        game = self.sessions.get(get_session_key(ctx)) or await self.sessions.restore(ctx)
+        if game is None:
+            await ctx.send("There is no UNO game in this channel.")
+            return
+        game.touch()
+        await game.actions.call(lambda: game.handle_cheat_code(ctx, code))
+
+    @commands.command(name="trace", help="Owner only: trace on, trace off or trace export")
+    @commands.is_owner()
+    async def trace(self, ctx, action: str):
+        if action == "on":
+            tracer.enabled = True
+            await ctx.send("Tracing enabled.")
+        elif action == "off":
+            tracer.enabled = False
+            await ctx.send("Tracing disabled.")
+        elif action == "export":
+            path = os.path.join(TRACE_DIR, f"trace-{int(time.time())}.json")
+            count = tracer.export(path)
+            await ctx.send(f"Wrote {count} spans to {path}.")
+        else:
+            await ctx.send("Usage: !trace on|off|export")
+
+    @commands.command(name="profile", help="Owner only: profile start or profile stop")
+    @commands.is_owner()
+    async def profile(self, ctx, action: str):
+        if action == "start":
+            profiler.start()
+            await ctx.send("Profiler started.")
+        elif action == "stop":
+            if not profiler.is_running():
+                await ctx.send("Profiler is not running.")
+                return
+            profiler.stop()
+            path = os.path.join(TRACE_DIR, f"profile-{int(time.time())}.folded")
+            count = await asyncio.to_thread(profiler.write_folded, path)
+            await ctx.send(f"Wrote {count} samples to {path}.")
+        else:
+            await ctx.send("Usage: !profile start|stop")
 
     @commands.Cog.listener()
-    async def on_button_click(self, interaction: discord.Interaction):
-        if interaction.type == discord.InteractionType.component:
-            # Workaround: Accessing custom_id from interaction.data
-            custom_id = interaction.data.get('custom_id', None)  # Use interaction.data for custom_id
-
-            if custom_id is None:
-                return  # If there's no custom_id, we can't handle the interaction
-
-            if custom_id == "join-btn":
-                await self.game_ui.join_button(interaction)
-            elif custom_id == "start-btn":
-                await self.game_ui.handle_start_button(interaction)
-            elif custom_id == "cancel-btn":
-                await self.game_ui.handle_cancel_button(interaction)
-            elif custom_id == "show-cards-btn":
-                await self.game_ui.handle_show_cards_button(interaction)
-            elif custom_id.startswith("card-"):
-                card_id = int(custom_id.split("-")[1])  # Get the card ID from the custom_id
-                await self.game_ui.handle_card_button(interaction, card_id)
-            elif custom_id.startswith("color-"):
-                parts = custom_id.split("-")  # Split color and card ID
-                color, card_id = parts[1], int(parts[2])
-                await self.game_ui.handle_color_selection(interaction, card_id, color)
-            elif custom_id == "draw-card-btn":
-                await self.game_ui.handle_draw_card_button(interaction)
-            elif custom_id == "say-uno-btn":
-                await self.game_ui.handle_say_uno(interaction)
+    async def on_interaction(self, interaction: discord.Interaction):
+        # discord.py annab nupuvajutused edasi ainult "interaction" sündmusena
+        if interaction.type != discord.InteractionType.component:
+            return
+
+        custom_id = interaction.data.get("custom_id")
+        resolved = router.resolve(custom_id) if custom_id else None
+        if resolved is None:
+            return  # Tundmatu nupp, mängu pole vaja otsida
+
+        route, args = resolved
+        with tracer.trace(f"interaction {route.name}", custom_id=custom_id):
+            # Kinnitame kohe, Discord ootab vastust kuni 3 sekundit; tegevus ise läheb mängu järjekorda
+            with tracer.span("interaction.defer"):
+                await interaction.response.defer()
+
+            game_ui = self.sessions.get_for_interaction(interaction) or await self.sessions.restore(interaction)
+            if game_ui is None:
+                return  # Mäng on juba lõppenud
+
+            game_ui.touch()
+            if not game_ui.actions.submit(lambda: router.dispatch(route, args, game_ui, interaction)):
+                await outbound.call(get_interaction_route(interaction), lambda: interaction.followup.send(
+                    "The game is busy. Try again in a moment.", ephemeral=True
+                ))
+
 
 async def setup(bot):
     await bot.add_cog(GameCommands(bot))
@@ -0,0 +1,174 @@
+import asyncio
+import time
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import discord
+from discord import Interaction
+from discord.ext import commands
+
+from application.game_store import GameRecord, GameStore
+from commands.game_ui import GameUI
+from commands.metrics import metrics
+from commands.outbound import outbound
+
+# (guild id, channel id) - üks mäng kanali kohta
+SessionKey = Tuple[int, int]
+
+
+def get_session_key(interaction: Union[Interaction, commands.Context]) -> SessionKey:
+    guild_id = interaction.guild.id if interaction.guild else 0
+    return guild_id, interaction.channel.id
+
+
+class GameSessions:
+    def __init__(self, max_sessions: int = 10000, store: Optional[GameStore] = None):
+        self.max_sessions = max_sessions
+        self.store = store
+        self.by_channel: Dict[SessionKey, GameUI] = {}
+        self.by_message: Dict[int, GameUI] = {}
+        self.keys: Dict[int, SessionKey] = {}  # id(game) -> session key
+        self.restoring: Dict[SessionKey, asyncio.Task] = {}  # Pooleli taastamised
+
+    def __len__(self) -> int:
+        return len(self.by_channel)
+
+    def get(self, key: SessionKey) -> Optional[GameUI]:
+        return self.by_channel.get(key)
+
+    def get_for_interaction(self, interaction: Interaction) -> Optional[GameUI]:
+        # Mängu sõnumi nupud leiame sõnumi id järgi, ephemeral vastuste nupud kanali järgi
+        if interaction.message is not None:
+            game = self.by_message.get(interaction.message.id)
+            if game is not None:
+                return game
+        return self.by_channel.get(get_session_key(interaction))
+
+    def create(self, key: SessionKey) -> Optional[GameUI]:
+        if key in self.by_channel:
+            return self.by_channel[key]
+        if len(self.by_channel) >= self.max_sessions:
+            return None
+
+        game = GameUI(on_close=self.close, on_change=self.save)
+        self.by_channel[key] = game
+        self.keys[id(game)] = key
+        return game
+
+    def bind_message(self, game: GameUI) -> None:
+        if game.message is None:
+            raise ValueError("Message is null")
+        self.by_message[game.message.id] = game
+
+    def save(self, game: GameUI) -> None:
+        key = self.keys.get(id(game))
+        if self.store is not None and key is not None:
+            self.store.save(game.to_record(key))
+
+    def close(self, game: GameUI) -> None:
+        key = self.forget(game)
+        if key is not None and self.store is not None:
+            self.store.delete(key)
+
+    def forget(self, game: GameUI) -> Optional[SessionKey]:
+        """Drops the game from memory only; its stored record stays."""
+        key = self.keys.pop(id(game), None)
+        if key is not None and self.by_channel.get(key) is game:
+            del self.by_channel[key]
+        else:
+            key = None
+        if game.message is not None and self.by_message.get(game.message.id) is game:
+            del self.by_message[game.message.id]
+        return key
+
+    def spill(self, game: GameUI) -> bool:
+        """Writes an idle game to the store and drops it from memory; restore() brings it back."""
+        key = self.keys.get(id(game))
+        if self.store is None or key is None or game.message is None or game.is_busy():
+            return False
+        # Salvestusaeg on viimase tegevuse aeg, et kõva TTL loeks ikka sellest
+        idle_since = time.time() - (time.monotonic() - game.last_active)
+        self.store.save(game.to_record(key, idle_since))
+        self.forget(game)
+        game.release()
+        return True
+
+    async def evict_idle(self, soft_ttl: float, hard_ttl: float,
+                         get_channel: Optional[Callable[[int], Optional[discord.abc.Messageable]]] = None) -> Tuple[int, int]:
+        """Spills games idle for `soft_ttl` seconds and closes those idle for `hard_ttl`."""
+        now = time.monotonic()
+        spilled = closed = 0
+        for game in list(self.by_channel.values()):
+            idle = now - game.last_active
+            if idle >= hard_ttl and not game.is_busy():
+                game.close_idle_game()
+                closed += 1
+            elif idle >= soft_ttl and self.spill(game):
+                spilled += 1
+
+        if self.store is not None:
+            # Mälust juba välja kirjutatud mängud, mida keegi pole vahepeal taastanud
+            for key, message_id in await self.store.find_idle(time.time() - hard_ttl):
+                if key in self.by_channel:
+                    continue
+                self.store.delete(key)
+                closed += 1
+                channel = get_channel(key[1]) if get_channel is not None and message_id is not None else None
+                if channel is not None:
+                    outbound.delete(channel.get_partial_message(message_id))
+
+        metrics.games_evicted.inc("spilled", amount=spilled)
+        metrics.games_evicted.inc("closed", amount=closed)
+        return spilled, closed
+
+    async def run_eviction(self, soft_ttl: float, hard_ttl: float, interval: float = 60.0,
+                           get_channel: Optional[Callable[[int], Optional[discord.abc.Messageable]]] = None) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.evict_idle(soft_ttl, hard_ttl, get_channel)
+
+    async def restore(self, interaction: Union[Interaction, commands.Context]) -> Optional[GameUI]:
+        """Loads a stored game when one of its interactions arrives after a restart or after it was spilled."""
+        if self.store is None:
+            return None
+
+        record = None
+        if interaction.message is not None:
+            record = await self.store.load_by_message(interaction.message.id)
+        if record is None:
+            record = await self.store.load(get_session_key(interaction))
+        if record is None or record.message_id is None:
+            return None
+
+        # Teine interaktsioon võis mängu vahepeal juba laadida
+        if record.key in self.by_channel:
+            return self.by_channel[record.key]
+
+        # Samaaegsed interaktsioonid ootavad sama taastamist, mitte pooleli mängu
+        task = self.restoring.get(record.key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self.load_game(record, interaction.guild, interaction.channel))
+            self.restoring[record.key] = task
+        return await asyncio.shield(task)
+
+    async def load_game(self, record: GameRecord, guild: discord.Guild,
+                        channel: discord.abc.Messageable) -> Optional[GameUI]:
+        """Rebuilds a stored game and registers it only once it is complete."""
+        try:
+            game = GameUI(on_close=self.close, on_change=self.save)
+            try:
+                await game.restore(record, guild, channel)
+            except discord.NotFound:
+                # Mängu sõnum või mängija on kadunud, seda mängu ei saa jätkata
+                game.release()
+                self.store.delete(record.key)
+                return None
+
+            if len(self.by_channel) >= self.max_sessions:
+                game.release()
+                return None
+            self.by_channel[record.key] = game
+            self.keys[id(game)] = record.key
+            self.bind_message(game)
+            return game
+        finally:
+            self.restoring.pop(record.key, None)
@@ -1,198 +1,201 @@
 import asyncio
+import io
+import itertools
+import os
+import time
+from collections import defaultdict, deque
+from typing import Callable, Optional
 
 import discord
 from discord import ButtonStyle, Button
 from discord import Interaction, Embed
 from discord.ui import Button
 from discord.ui import View
+from discord.ext import commands
 
+from application.bot_player import Move, apply_move, heuristic_move, is_bot_id
+from application.event_log import EventLog, LOG_EXTENSION
 from application.game_logic import GameLogic
+from application.game_store import GameRecord
 from application.types import GameCheat
+from commands.action_queue import ActionQueue
+from commands.bot_players import BotMember, bot_moves
+from commands.card_assets import card_assets
+from commands.cleanup import cleanup
+from commands.hand_images import hand_images
+from commands.hand_view import HandViews, get_card_label, get_color_emoji
+from commands.message_editor import MessageEditor
+from commands.metrics import metrics
+from commands.outbound import TURN, outbound
+from commands.tracing import tracer
 from common.types import Card
-from common.types import Player
 
 
-def get_card_label(card: Card) -> str:
-    color_emoji = get_color_emoji(card.color)
-    return f"{color_emoji}{card.face}"
-
-
-def get_color_emoji(color: str) -> str:
-    if color == "Wild":
-        return "⚫"
-    elif color == "Red":
-        return "🔴"
-    elif color == "Green":
-        return "🟢"
-    elif color == "Blue":
-        return "🔵"
-    elif color == "Yellow":
-        return "🟡"
-    else:
-        raise ValueError("Unknown color")
-
-
-def get_card_image_path(card: Card) -> str:
-    base_path = "./assets/images/cards"
-    return f"{base_path}/card-{card.color.lower()}-{card.face.lower().replace(' ', '_')}.png"
+def get_interaction_route(interaction: Interaction) -> str:
+    # Followupid ja nende kustutamine jagavad interaktsiooni webhooki rate limiti
+    return f"interaction:{interaction.id}"
 
 
 class GameUI(View):
-    def __init__(self):
+    max_players = 10
+    max_action_replies = 5
+    status_fields = (("Deck", True), ("Discard", True), ("Players", False), ("Top card", True), ("Placed by", True))
+
+    def __init__(self, on_close: Optional[Callable[["GameUI"], None]] = None,
+                 on_change: Optional[Callable[["GameUI"], None]] = None):
         super().__init__()
         self.message = None
         self.initiator = None
         self.last_player = None
         self.game_logic = GameLogic()
         self.players = []
-
-        self.action_player_interactions: dict[str, dict[str, list[Interaction]]] = {
-            "cardSelection": {},
-            "wildCardColorSelection": {}
+        self.on_close = on_close
+        self.on_change = on_change
+        self.attached_image = None  # Filename of the card image attached to the game message
+        self.message_editor: Optional[MessageEditor] = None
+        self.bot_task: Optional[asyncio.Task] = None
+        self.actions = ActionQueue()  # Nupuvajutused ja boti käigud rakendatakse siin ükshaaval
+        self.hand_views = HandViews()
+        self.last_active = time.monotonic()
+
+        # Olekusõnumi embed ja iga välja viimane sisend, et muuta ainult muutunud välju
+        self.status_embed: Optional[Embed] = None
+        self.status_embed_version = None
+        self.status_field_keys: list = []
+        self.status_image_url = None
+
+        # Hoiame iga mängija kohta ainult viimased vastused, et mälu ei kasvaks
+        self.action_replies: dict[str, dict[int, deque[tuple[discord.WebhookMessage, str]]]] = {
+            "cardSelection": defaultdict(self.new_reply_queue),
+            "wildCardColorSelection": defaultdict(self.new_reply_queue)
         }
 
-    async def handle_start(self, interaction: Interaction):
+    @classmethod
+    def new_reply_queue(cls) -> deque:
+        return deque(maxlen=cls.max_action_replies)
+
+    async def interaction_check(self, interaction: Interaction) -> bool:
+        # Nupuvajutused käsitleb GameCommands.on_interaction marsruuteri kaudu, vaade ainult näitab nuppe
+        return False
+
+    @metrics.handler
+    async def handle_start(self, ctx: commands.Context):
         if self.initiator is not None:
-            await interaction.response.send_message(
-                "There is already a lobby in progress.", ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            await self.reply_to_context(ctx, "There is already a lobby in progress.")
             return
 
-        self.initiator = interaction.user
+        self.initiator = ctx.author
         self.players.append(self.initiator)
 
-        await interaction.response.send_message(
-            f"Lobby created! {self.initiator.mention} is the host.", view=self
+        self.message = await self.reply_to_context(
+            ctx, f"Lobby created! {self.initiator.mention} is the host.", delete_after=None, view=self
         )
+        self.notify_change()
 
     @discord.ui.button(label="Join", style=ButtonStyle.primary, custom_id="join-btn")
+    @metrics.handler
     async def join_button(self, interaction: Interaction):
         if self.message is None:
             raise ValueError("Message is null")
         member = interaction.user
         if any(player.id == member.id for player in self.players):
-            await interaction.response.send_message(
-                "You have already joined this lobby.", ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            await self.reply(interaction, "You have already joined this lobby.")
+            return
+        if len(self.players) >= self.max_players:
+            await self.reply(interaction, "The lobby is full.")
             return
         self.players.append(member)
-        await self.message.edit(content=self.get_message_content())
+        self.get_message_editor().request(content=self.get_message_content())
+        self.notify_change()
         if self.initiator is None:
             raise ValueError("Initiator is null")
-        await interaction.response.send_message(
-            f"You have joined {self.initiator.mention}'s lobby.", ephemeral=True
-        )
-        await asyncio.sleep(10)
-        await interaction.delete_original_response()
+        await self.reply(interaction, f"You have joined {self.initiator.mention}'s lobby.")
 
     @discord.ui.button(label="Start", style=ButtonStyle.success, custom_id="start-btn")
+    @metrics.handler
     async def handle_start_button(self, interaction: Interaction):
         member = interaction.user
         if self.initiator != member:
-            await interaction.response.send_message(
-                "You are not the initiator.",
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            await self.reply(interaction, "You are not the initiator.")
             return
 
         min_player_amount = 2
         if len(self.players) < min_player_amount:
-            await interaction.response.send_message(
-                f"Not enough players. Needed amount: {min_player_amount}.",
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            await self.reply(interaction, f"Not enough players. Needed amount: {min_player_amount}.")
             return
         if self.message is None:
             raise ValueError("Message is null")
         await self.start_game()
 
-        await interaction.response.send_message(
-            "Game has started!",
-            ephemeral=False
-        )
-        await asyncio.sleep(10)
-        await interaction.delete_original_response()
+        await self.reply(interaction, "Game has started!", ephemeral=False)
+
+    @discord.ui.button(label="Add Bot", style=ButtonStyle.secondary, custom_id="add-bot-btn")
+    @metrics.handler
+    async def add_bot_button(self, interaction: Interaction):
+        if self.initiator != interaction.user:
+            await self.reply(interaction, "You are not the initiator.")
+            return
+        if len(self.players) >= self.max_players:
+            await self.reply(interaction, "The lobby is full.")
+            return
+
+        bot_ids = {player.id for player in self.players if is_bot_id(player.id)}
+        bot = BotMember(next(bot_id for bot_id in itertools.count(1) if bot_id not in bot_ids))
+        self.players.append(bot)
+        self.get_message_editor().request(content=self.get_message_content())
+        self.notify_change()
+        await self.reply(interaction, f"{bot.name} joined the lobby.")
 
     @discord.ui.button(label="Cancel", style=ButtonStyle.danger, custom_id="cancel-btn")
+    @metrics.handler
     async def handle_cancel_button(self, interaction: Interaction):
         if self.message is None:
             raise ValueError("Message is null")
 
         member = interaction.user
         if self.initiator != member:
-            await interaction.response.send_message(
-                "You are not the initiator.",
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            await self.reply(interaction, "You are not the initiator.")
             return
 
-        await self.message.delete()
-        self.reset_game()
-
-        await interaction.response.send_message(
-            "You have deleted the lobby.",
-            ephemeral=True
-        )
+        await outbound.delete(self.message, priority=TURN)
+        self.close_game()
 
-        await asyncio.sleep(10)
-        await interaction.delete_original_response()
+        await self.reply(interaction, "You have deleted the lobby.")
 
+    @metrics.handler
     async def handle_show_cards_button(self, interaction: Interaction):
         member = interaction.user
-        await self.delete_action_replies(["cardSelection", "wildCardColorSelection"], member.name)
-
-        cards = self.game_logic.get_player_cards(member.id)
-
-        current_player = self.game_logic.get_current_player()
-        if isinstance(current_player, Player):
-            is_current_player = current_player.id == member.id
-
-            buttons = []
-            for card in cards:
-                label = get_card_label(card)
-                can_play = self.game_logic.can_play_card(card, current_player.id)
-
-                button = Button(
-                    label=label,
-                    style=ButtonStyle.secondary,
-                    custom_id=f"card-{card.id}",
-                    disabled=not is_current_player or not can_play
-                )
-                buttons.append(button)
-
-            draw_card_button = Button(
-                label="Draw Card",
-                style=ButtonStyle.danger,
-                custom_id="draw-card-btn",
-                disabled=not is_current_player
-            )
-            buttons.append(draw_card_button)
-            max_buttons_per_row = 25
-
-            rows = []
-            for i in range(0, len(buttons), max_buttons_per_row):
-                row = buttons[i:i + max_buttons_per_row]
-                view = View()
-                view.add_item(*row)
-                rows.append(view)
-
-            for row in rows:
-                await interaction.response.send_message(
-                    content="Here are your cards:",
-                    view=row
-                )
-            self.add_action_player_interaction("cardSelection", interaction.user.name, interaction)
-
+        self.delete_action_replies(["cardSelection", "wildCardColorSelection"], member.id)
+
+        page = self.get_hand_pages(member.id)[0]
+        message = await self.reply(interaction, page.get_content(), delete_after=None, view=page.view,
+                                   files=await self.get_hand_files(page))
+        self.add_action_reply("cardSelection", member.id, message, interaction)
+
+    @metrics.handler
+    async def handle_hand_page(self, interaction: Interaction, index: int):
+        # Lehitsemine muudab sama ephemeral sõnumit, uut vastust ei saadeta
+        pages = self.get_hand_pages(interaction.user.id)
+        page = pages[min(index, len(pages) - 1)]
+        files = await self.get_hand_files(page)
+        await outbound.call(get_interaction_route(interaction), lambda: interaction.edit_original_response(
+            content=page.get_content(), view=page.view, attachments=files
+        ))
+
+    def get_hand_pages(self, player_id: int) -> list:
+        player = self.game_logic.get_player(player_id)
+        is_current_player = self.game_logic.is_current_player(player_id)
+        with tracer.span("hand_views.get_pages"):
+            return self.hand_views.get_pages(player, self.game_logic.get_top_card(),
+                                             self.game_logic.get_playable_mask(player), is_current_player)
+
+    async def get_hand_files(self, page) -> list:
+        # Käe pilt renderdatakse tööprotsessis ja sama käsi tuleb vahemälust
+        with tracer.span("hand_images.render", cards=len(page.cards)):
+            hand_image = await hand_images.render(page.cards)
+        return [discord.File(io.BytesIO(hand_image), filename="hand.png")] if hand_image else []
+
+    @metrics.handler
     async def handle_card_button(self, interaction: discord.Interaction, card_id: int):
         if self.message is None:
             raise ValueError("Message is null")
@@ -202,65 +205,32 @@ class GameUI(View):
         card = next((c for c in player_cards if c.id == card_id), None)
 
         if not card:
-            await interaction.response.send_message(
-                "Card not found.",
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            await self.reply(interaction, "Card not found.")
             return
 
         if card.color == "Wild":
             await self.handle_wild_card_color(card_id, interaction)
             return
 
-        result = self.game_logic.play_card(self.players[member.id], card_id)
+        with tracer.span("GameLogic.play_card"):
+            result = self.game_logic.play_card(member.id, card_id)
 
         if "error" in result:
-            await interaction.response.send_message(
-                result["error"],
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            metrics.count_game_error(result)
+            await self.reply(interaction, result["error"])
             return
 
         self.last_player = member
 
-        await interaction.response.send_message(
-            "You played a card.",
-            ephemeral=True
-        )
-
-        await interaction.delete_original_response()
-
         top_card = self.game_logic.get_top_card()
-        await self.message.edit(
-            content=self.get_game_message_content(),
-            attachments=[get_card_image_path(top_card) if top_card else []]
-        )
-
-        await self.delete_action_replies(["cardSelection", "wildCardColorSelection"], self.players[member.id])
-
-        is_winner = self.game_logic.is_winner(self.players[member.id])
-        if not is_winner:
-            return
-
-        if not top_card:
-            raise ValueError("Top card is null")
+        self.edit_game_message()
 
-        card_label = get_card_label(top_card)
-        await self.message.edit(
-            content=f"🏆 {member.mention} has won the game!\n\n... by placing {card_label} as their last card.",
-            components=[],
-            attachments=[]
-        )
+        self.delete_action_replies(["cardSelection", "wildCardColorSelection"], member.id)
 
-        # Timeout, pärast seda kustutame sõnumi ja lähtestame mängu
-        await asyncio.sleep(30)
-        await self.message.delete()
-        self.reset_game()
+        if self.game_logic.is_winner(member.id):
+            await self.finish_game(member, top_card)
 
+    @metrics.handler
     async def handle_color_selection(self, interaction: Interaction, card_id: int, color: str):
         if self.message is None:
             raise ValueError("Message is null")
@@ -270,68 +240,34 @@ class GameUI(View):
         card = next((c for c in player_cards if c.id == card_id), None)
 
         if not card:
-            await interaction.response.send_message(
-                "Card not found.",
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            await self.reply(interaction, "Card not found.")
             return
 
-        result2 = self.game_logic.play_card(self.players[member.id], card_id)
+        with tracer.span("GameLogic.play_card"):
+            result2 = self.game_logic.play_card(member.id, card_id)
         if "error" in result2:
-            await interaction.response.send_message(
-                result2["error"],
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            metrics.count_game_error(result2)
+            await self.reply(interaction, result2["error"])
             return
 
-        result1 = self.game_logic.change_wild_card_color(card_id, color)
+        with tracer.span("GameLogic.change_wild_card_color"):
+            result1 = self.game_logic.change_wild_card_color(card_id, color)
         if "error" in result1:
-            await interaction.response.send_message(
-                result1["error"],
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            metrics.count_game_error(result1)
+            await self.reply(interaction, result1["error"])
             return
 
         self.last_player = member
 
-        await interaction.response.send_message(
-            "You played a card.",
-            ephemeral=True
-        )
-
-        await interaction.delete_original_response()
-
-        await self.delete_action_replies(["cardSelection", "wildCardColorSelection"], (self.players[member.id]))
+        self.delete_action_replies(["cardSelection", "wildCardColorSelection"], member.id)
 
         top_card = self.game_logic.get_top_card()
-        await self.message.edit(
-            content=self.get_game_message_content(),
-            attachments=[get_card_image_path(top_card) if top_card else []]
-        )
-
-        is_winner = self.game_logic.is_winner(self.players[member.id])
-        if not is_winner:
-            return
+        self.edit_game_message()
 
-        if not top_card:
-            raise ValueError("Top card is null")
-
-        card_label = get_card_label(top_card)
-        await self.message.edit(
-            content=f"🏆 {member.mention} has won the game!\n\n... by placing {card_label} as their last card.",
-            components=[],
-            attachments=[]
-        )
-        await asyncio.sleep(30)
-        await self.message.delete()
-        self.reset_game()
+        if self.game_logic.is_winner(member.id):
+            await self.finish_game(member, top_card)
 
+    @metrics.handler
     async def handle_draw_card_button(self, interaction: Interaction):
         if self.message is None:
             raise ValueError("Message is null")
@@ -340,36 +276,20 @@ class GameUI(View):
         current_player = self.game_logic.get_current_player()
 
         if current_player.id != member.id:
-            await interaction.response.send_message(
-                "It is not your turn.",
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            await self.reply(interaction, "It is not your turn.")
             return
-        result = self.game_logic.draw_card(self.players[member.id])
+        with tracer.span("GameLogic.draw_card"):
+            result = self.game_logic.draw_card(member.id)
         if "error" in result:
-            await interaction.response.send_message(
-                result["error"],
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            metrics.count_game_error(result)
+            await self.reply(interaction, result["error"])
             return
 
-        await interaction.response.send_message(
-            "You drew a card.",
-            ephemeral=True
-        )
-
-        await interaction.delete_original_response()
+        self.delete_action_replies(["cardSelection", "wildCardColorSelection"], member.id)
 
-        await self.delete_action_replies(["cardSelection", "wildCardColorSelection"], self.players[member.id])
-
-        await self.message.edit(
-            content=self.get_game_message_content(),
-        )
+        self.edit_game_message()
 
+    @metrics.handler
     async def handle_say_uno(self, interaction: Interaction):
         if self.message is None:
             raise ValueError("Message is null")
@@ -377,109 +297,218 @@ class GameUI(View):
         member = interaction.user
 
         if member.id != self.game_logic.get_current_player().id:
-            await interaction.response.send_message(
-                "It is not your turn.",
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            await self.reply(interaction, "It is not your turn.")
             return
 
-        result = self.game_logic.say_uno(self.players[member.id])
+        with tracer.span("GameLogic.say_uno"):
+            result = self.game_logic.say_uno(member.id)
 
         if "error" in result:
-            await interaction.response.send_message(
-                result["error"],
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            metrics.count_game_error(result)
+            await self.reply(interaction, result["error"])
             return
+        self.notify_change()
 
         # Tagasiside, et mängija ütles "UNO"
-        await interaction.response.send_message(
-            f"{member.mention} said UNO!"
-        )
+        await self.reply(interaction, f"{member.mention} said UNO!", ephemeral=False)
 
-        await asyncio.sleep(10)
-        await interaction.delete_original_response()
-
-    async def handle_cheat_code(self, interaction: Interaction, code: str):
+    @metrics.handler
+    async def handle_cheat_code(self, ctx: commands.Context, code: str):
         if self.message is None:
             raise ValueError("Message is null")
 
-        member = interaction.user
+        member = ctx.author
         result = {"data": None, "error": "No cheat code found"}
 
         if code == "giveWildFour":
-            result = self.game_logic.activate_cheat_code(self.players[member.id], GameCheat.GIVE_WILD_FOUR)
+            with tracer.span("GameLogic.activate_cheat_code"):
+                result = self.game_logic.activate_cheat_code(member.id, GameCheat.GIVE_WILD_FOUR)
         elif code == "giveWildEight":
-            result = self.game_logic.activate_cheat_code(self.players[member.id], GameCheat.GIVE_WILD_EIGHT)
+            with tracer.span("GameLogic.activate_cheat_code"):
+                result = self.game_logic.activate_cheat_code(member.id, GameCheat.GIVE_WILD_EIGHT)
 
         if "error" in result:
-            await interaction.response.send_message(
-                result["error"],
-                ephemeral=True
-            )
-            await asyncio.sleep(10)
-            await interaction.delete_original_response()
+            metrics.count_game_error(result)
+            await self.reply_to_context(ctx, result["error"])
             return
 
-        await self.message.edit(
-            embeds=[self.get_game_message_content()]
-        )
+        self.edit_game_message()
 
-        await interaction.response.send_message(
-            "Cheat code activated.",
-            ephemeral=True
-        )
+        await self.reply_to_context(ctx, "Cheat code activated.")
 
     async def handle_wild_card_color(self, card_id: int, interaction: Interaction):
         colors = ["Red", "Green", "Blue", "Yellow"]
 
-        buttons = [
-            Button(
+        view = View()
+        for color in colors:
+            view.add_item(Button(
                 label=get_color_emoji(color),
                 style=discord.ButtonStyle.secondary,
                 custom_id=f"color-{color}-{card_id}",
-            )
-            for color in colors
-        ]
-
-        await interaction.response.send_message(
-            content="Select a color for the wild card:",
-            components=[buttons],
-            ephemeral=True,
-        )
+            ))
 
         member = interaction.user
-        await self.delete_action_replies(["wildCardColorSelection"], self.players[member.id])
-        self.add_action_player_interaction("wildCardColorSelection", self.players[member.id], interaction)
+        self.delete_action_replies(["wildCardColorSelection"], member.id)
+        message = await self.reply(interaction, "Select a color for the wild card:", delete_after=None, view=view)
+        self.add_action_reply("wildCardColorSelection", member.id, message, interaction)
 
-    def add_action_player_interaction(self, action: str, player_id: str, interaction: Interaction):
-        self.action_player_interactions[action][player_id].append(interaction)
+    async def finish_game(self, winner, top_card: Optional[Card]):
+        if self.message is None:
+            raise ValueError("Message is null")
+        if not top_card:
+            raise ValueError("Top card is null")
+
+        card_label = get_card_label(top_card)
+        await self.get_message_editor().replace(
+            content=f"🏆 {winner.mention} has won the game!\n\n... by placing {card_label} as their last card.",
+            view=None,
+            embed=None,
+            attachments=[]
+        )
+        self.attached_image = None
+
+        # Sõnum kustutatakse 30 sekundi pärast, mäng suletakse kohe
+        message = self.message
+        cleanup.schedule(lambda: outbound.delete(message), 30)
+        self.close_game()
 
-    async def delete_action_replies(self, actions: list, player_id: str) -> None:
+    def schedule_bot_turn(self) -> None:
+        if not self.is_started() or self.is_over() or (self.bot_task is not None and not self.bot_task.done()):
+            return
+        if is_bot_id(self.game_logic.get_current_player().id):
+            self.bot_task = asyncio.get_running_loop().create_task(self.run_bot_turns())
+
+    async def run_bot_turns(self):
+        # Botid käivad järjest, kuni kord jõuab inimeseni; otsing käib protsessipoolis
+        while self.is_started() and not self.is_over():
+            player_id = self.game_logic.get_current_player().id
+            if not is_bot_id(player_id):
+                return
+            move = await bot_moves.choose_move(self.game_logic, player_id)
+            # Käik rakendatakse samas järjekorras nupuvajutustega, et need ei põimuks
+            if not await self.actions.call(lambda: self.apply_bot_move(player_id, move)):
+                return
+
+    async def apply_bot_move(self, player_id: int, move: Move) -> bool:
+        if not self.is_started() or not self.game_logic.is_current_player(player_id):
+            return False  # Mäng lõppes või muutus otsingu ajal
+        bot = next(player for player in self.players if player.id == player_id)
+
+        with tracer.span("GameLogic.bot_move"):
+            result = apply_move(self.game_logic, player_id, move)
+            if "error" in result:
+                # Otsingu ajal muutunud oleku tõttu ei sobinud käik enam
+                result = apply_move(self.game_logic, player_id, heuristic_move(self.game_logic, player_id))
+        if "error" in result:
+            metrics.count_game_error(result)
+            return False
+
+        if move is not None:
+            self.last_player = bot
+        self.get_message_editor().request(self.get_game_message_payload)
+        self.notify_change()
+
+        if self.game_logic.is_winner(player_id):
+            await self.finish_game(bot, self.game_logic.get_top_card())
+            return False
+        return True
+
+    async def reply(self, interaction: Interaction, content: str, ephemeral: bool = True,
+                    delete_after: Optional[float] = 10, **kwargs):
+        # Nupuvajutus on juba kinnitatud (defer), seega vastus saadetakse followupina
+        if not kwargs.get("files"):
+            kwargs.pop("files", None)
+        route = get_interaction_route(interaction)
+        message = await outbound.call(
+            route, lambda: interaction.followup.send(content, ephemeral=ephemeral, wait=True, **kwargs)
+        )
+        if delete_after is not None:
+            # Ephemeral sõnumeid saab kustutada ainult interaktsiooni kaudu, teisi kanalis koos teistega
+            delete_route = route if ephemeral else None
+            cleanup.schedule(lambda: outbound.delete(message, delete_route), delete_after)
+        return message
+
+    async def reply_to_context(self, ctx: commands.Context, content: str, delete_after: Optional[float] = 10, **kwargs):
+        # Prefiksikäsul pole interaktsiooni ega ephemeral vastuseid, vastus läheb kanalisse
+        message = await outbound.call(f"send:{ctx.channel.id}", lambda: ctx.send(content, **kwargs))
+        if delete_after is not None:
+            cleanup.schedule(lambda: outbound.delete(message), delete_after)
+        return message
+
+    def add_action_reply(self, action: str, player_id: int, message, interaction: Interaction):
+        self.action_replies[action][player_id].append((message, get_interaction_route(interaction)))
+
+    def delete_action_replies(self, actions: list, player_id: int) -> None:
+        # Vanad käed kustutatakse madalama prioriteediga, käik ise neid ei oota
         for action in actions:
-            interactions = self.action_player_interactions.get(action, {}).get(player_id, [])
-            self.action_player_interactions[action][player_id] = []  # Clear interactions for this player
-            await asyncio.gather(*(interaction.delete_original_response() for interaction in interactions))
+            for message, route in self.action_replies[action].pop(player_id, []):  # Clear replies for this player
+                outbound.delete(message, route)
 
     def reset_game(self):
         self.initiator = None
         self.message = None
         self.players.clear()
+        self.attached_image = None
+        self.status_embed = None
+        self.status_embed_version = None
         self.game_logic.reset()
+        for replies in self.action_replies.values():
+            replies.clear()
+        self.hand_views.clear()
+
+    def close_game(self):
+        if self.on_close is not None:
+            self.on_close(self)
+        self.release()
+        self.reset_game()
+
+    def release(self):
+        """Stops everything that runs for this game in memory. A stored record of it is kept."""
+        if self.message_editor is not None:
+            self.message_editor.cancel()
+            self.message_editor = None
+        if self.bot_task is not None and self.bot_task is not asyncio.current_task():
+            self.bot_task.cancel()
+        self.bot_task = None
+        self.actions.clear()
+        if self.game_logic.event_log is not None:
+            self.game_logic.event_log.close()
+            self.game_logic.event_log = None
+        self.stop()
+
+    def close_idle_game(self):
+        # Mängu sõnum ja mängijate vanad vastused kustutatakse, mäng suletakse
+        if self.message is not None:
+            outbound.delete(self.message)
+        player_ids = {player_id for replies in self.action_replies.values() for player_id in replies}
+        for player_id in player_ids:
+            self.delete_action_replies(list(self.action_replies), player_id)
+        self.close_game()
+
+    def touch(self) -> None:
+        self.last_active = time.monotonic()
+
+    def is_busy(self) -> bool:
+        return bool(self.actions) or (self.actions.task is not None and not self.actions.task.done()) or (
+            self.bot_task is not None and not self.bot_task.done())
+
+    def open_event_log(self) -> None:
+        # Kui GAME_LOG_DIR on seadistatud, kirjutatakse mängu käigud logisse
+        log_dir = os.getenv("GAME_LOG_DIR")
+        if log_dir:
+            self.game_logic.event_log = EventLog.open(os.path.join(log_dir, f"{self.message.id}{LOG_EXTENSION}"))
 
     async def start_game(self):
         if self.message is None:
             raise ValueError("Message is null")
 
-        player_ids = [player.user.id for player in self.players]  # kas user
-        self.game_logic.start_game(player_ids)
+        self.open_event_log()
+
+        player_ids = [player.id for player in self.players]
+        with tracer.span("GameLogic.start_game"):
+            self.game_logic.start_game(player_ids)
 
-        id_order = [player.id for player in self.game_logic.get_players()]
-        self.players.sort(key=lambda player: id_order.index(player.user.id))
+        self.players.sort(key=lambda player: self.game_logic.get_seat(player.id))
 
         say_uno_button = Button(
             label="Say UNO",
@@ -503,46 +532,138 @@ class GameUI(View):
         view.add_item(say_uno_button)
         view.add_item(leave_button)
 
-        await self.message.edit(
-            components=[show_cards_button, say_uno_button, leave_button],
-            content=None,
-            view=view,
-            embeds=[self.get_game_message_content()]
+        self.edit_game_message(content=None, view=view)
+
+    def get_message_editor(self) -> MessageEditor:
+        if self.message is None:
+            raise ValueError("Message is null")
+        if self.message_editor is None or self.message_editor.message is not self.message:
+            self.message_editor = MessageEditor(self.message)
+        return self.message_editor
+
+    def edit_game_message(self, **kwargs):
+        # Muudatused koondatakse ja sisu renderdatakse alles saatmise hetkel
+        self.get_message_editor().request(self.get_game_message_payload, **kwargs)
+        self.notify_change()
+        self.schedule_bot_turn()
+
+    def notify_change(self):
+        if self.on_change is not None:
+            self.on_change(self)
+
+    def is_started(self) -> bool:
+        return bool(self.game_logic.game_state.players)
+
+    def is_over(self) -> bool:
+        return any(not player.hand for player in self.game_logic.game_state.players)
+
+    def to_record(self, key, updated_at: Optional[float] = None) -> GameRecord:
+        return GameRecord(
+            key,
+            self.message.id if self.message else None,
+            self.initiator.id if self.initiator else None,
+            [player.id for player in self.players],
+            self.last_player.id if self.last_player else None,
+            self.game_logic if self.is_started() else None,
+            updated_at
         )
 
+    async def restore(self, record: GameRecord, guild: discord.Guild, channel: discord.abc.Messageable):
+        async def get_member(member_id: int):
+            if is_bot_id(member_id):
+                return BotMember(member_id)
+            return guild.get_member(member_id) or await guild.fetch_member(member_id)
+
+        self.message = await channel.fetch_message(record.message_id)
+        self.players = [await get_member(player_id) for player_id in record.player_ids]
+        members = {player.id: player for player in self.players}
+        self.initiator = members.get(record.initiator_id)
+        self.last_player = members.get(record.last_player_id)
+        if record.game_logic is not None:
+            self.game_logic = record.game_logic
+            # Logi jätkub samasse faili; hetkeseis kirjutatakse kohe, et taastamine algaks siit
+            self.open_event_log()
+            if self.game_logic.event_log is not None:
+                self.game_logic.event_log.write_snapshot(self.game_logic)
+            self.schedule_bot_turn()
+
+    @tracer.traced
+    def get_game_message_payload(self) -> dict:
+        payload = {"embed": self.get_game_message_content()}
+
+        top_card = self.game_logic.get_top_card()
+        filename = card_assets.get_filename(top_card) if top_card else None
+        if filename is None or card_assets.get_uploaded_url(top_card):
+            # Pilt tuleb juba üles laetud lingilt, faili pole vaja saata
+            payload["attachments"] = []
+            self.attached_image = None
+        elif filename != self.attached_image:
+            payload["attachments"] = [card_assets.get_file(top_card)]
+            self.attached_image = filename
+        # Muidu on sama pilt sõnumi küljes juba olemas ja manuseid ei puutu
+
+        return payload
+
+    @tracer.traced
     def get_game_message_content(self):
+        top_card = self.game_logic.get_top_card()
+        image_url = card_assets.get_image_url(top_card) if top_card else None
+
+        version = (self.game_logic.version, self.last_player, image_url)
+        if self.status_embed is not None and self.status_embed_version == version:
+            return self.status_embed
+
+        if self.status_embed is None:
+            self.status_embed = Embed(title="UNO Game Status")
+            for name, inline in self.status_fields:
+                self.status_embed.add_field(name=name, value="None", inline=inline)
+            self.status_field_keys = [None] * len(self.status_fields)
+            self.status_image_url = None
+
+        deck_card_amount = self.game_logic.get_deck_count()
+        self.update_status_field(0, deck_card_amount, lambda: str(deck_card_amount))
+
+        discard_card_amount = self.game_logic.get_discard_count()
+        self.update_status_field(1, discard_card_amount, lambda: str(discard_card_amount))
+
+        current_player = self.game_logic.get_current_player()
+        card_counts = tuple(self.game_logic.get_hand_count(player.id) for player in self.players)
+        is_reversed = self.game_logic.is_reversed()
+        self.update_status_field(2, (current_player.id, card_counts, is_reversed),
+                                 lambda: self.get_player_order_message(current_player.id, card_counts, is_reversed))
+
+        top_card_key = (top_card.id, top_card.color) if top_card else None
+        self.update_status_field(3, top_card_key, lambda: get_card_label(top_card) if top_card else "None")
+
+        self.update_status_field(4, self.last_player, lambda: str(self.last_player) if self.last_player else "None")
+
+        if image_url != self.status_image_url:
+            self.status_embed.set_image(url=image_url)
+            self.status_image_url = image_url
+
+        self.status_embed_version = version
+        return self.status_embed
+
+    def update_status_field(self, index: int, key, build_value: Callable[[], str]) -> None:
+        # Välja tekst ehitatakse uuesti ainult siis, kui selle sisend muutus
+        if self.status_field_keys[index] == key:
+            return
+        name, inline = self.status_fields[index]
+        self.status_embed.set_field_at(index, name=name, value=build_value(), inline=inline)
+        self.status_field_keys[index] = key
+
+    def get_player_order_message(self, current_player_id: int, card_counts: tuple, is_reversed: bool) -> str:
         players = []
-        for player in self.players:
-            card_count = len(self.game_logic.get_player_cards(player.user.id))
-            if player.user.id == self.game_logic.get_current_player().id:
+        for player, card_count in zip(self.players, card_counts):
+            if player.id == current_player_id:
                 players.append(f"> {str(player)} ({card_count} cards)")
             else:
                 players.append(f"     {str(player)} ({card_count} cards)")
 
-        if self.game_logic.is_reversed():
+        if is_reversed:
             players.reverse()
 
-        order_message = "\n".join(players)
-
-        top_card = self.game_logic.get_top_card()
-        top_card_label = get_card_label(top_card) if top_card else "None"
-
-        deck_card_amount = len(self.game_logic.get_deck_cards())
-        discard_card_amount = len(self.game_logic.get_discard_cards())
-
-        embed = Embed(title="UNO Game Status")
-        embed.add_field(name="Deck", value=str(deck_card_amount), inline=True)
-        embed.add_field(name="Discard", value=str(discard_card_amount), inline=True)
-        embed.add_field(name="Players", value=order_message, inline=False)
-        embed.add_field(name="Top card", value=top_card_label, inline=True)
-        embed.add_field(name="Placed by", value=str(self.last_player) if self.last_player else "None", inline=True)
-        if top_card:
-            path = get_card_image_path(top_card)
-            base_path = "./assets/images/cards/"
-            if path.startswith(base_path):
-                path = path[len(base_path):]
-            embed.set_image(url=f"attachment://{path}")
-        return embed
+        return "\n".join(players)
 
     def get_message_content(self) -> str:
         if self.initiator is None:
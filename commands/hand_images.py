@@ -0,0 +1,121 @@
+import asyncio
+import io
+import os
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow puudub - käsi näidatakse ainult nuppudena
+    Image = None
+
+from application.cards import COLORS, WILD
+from commands.card_assets import BASE_PATH, IMAGE_FILENAMES
+from common.types import Card
+
+HandKey = Tuple[Tuple[str, str], ...]  # sorted (color, face) multiset
+
+CARD_HEIGHT = 150
+CARD_OVERLAP = 0.45  # Kui suur osa kaardist jääb järgmise alla näha
+CARDS_PER_ROW = 12
+
+# Iga tööprotsess laeb pildid üks kord
+_sprites: Dict[Tuple[str, str], "Image.Image"] = {}
+
+
+def get_hand_key(cards: Iterable[Card]) -> HandKey:
+    return tuple(sorted((card.color, card.face) for card in cards))
+
+
+def _load_sprite(color: str, face: str) -> "Image.Image":
+    key = (color, face)
+    if key in _sprites:
+        return _sprites[key]
+
+    if color == WILD:
+        # Värvimata Wild kaardi pilti pole, kasutame värvilise pildi halli versiooni
+        colored = _load_sprite(COLORS[0], face)
+        sprite = colored.convert("LA").convert("RGBA")
+    else:
+        with Image.open(os.path.join(BASE_PATH, IMAGE_FILENAMES[key])) as image:
+            sprite = image.convert("RGBA")
+        width = round(sprite.width * CARD_HEIGHT / sprite.height)
+        sprite = sprite.resize((width, CARD_HEIGHT))
+
+    _sprites[key] = sprite
+    return sprite
+
+
+def render_hand_image(hand_key: HandKey) -> bytes:
+    """Composites the hand into one PNG. Runs in a worker process."""
+    sprites = [_load_sprite(color, face) for color, face in hand_key]
+    card_width = max(sprite.width for sprite in sprites)
+    step = round(card_width * CARD_OVERLAP)
+    columns = min(len(sprites), CARDS_PER_ROW)
+    rows = (len(sprites) + CARDS_PER_ROW - 1) // CARDS_PER_ROW
+
+    image = Image.new("RGBA", (step * (columns - 1) + card_width, CARD_HEIGHT * rows), (0, 0, 0, 0))
+    for index, sprite in enumerate(sprites):
+        row, column = divmod(index, CARDS_PER_ROW)
+        image.alpha_composite(sprite, (step * column, CARD_HEIGHT * row))
+
+    output = io.BytesIO()
+    image.save(output, format="PNG", optimize=False)
+    return output.getvalue()
+
+
+class HandImageRenderer:
+    def __init__(self, max_cached: int = 512, executor: Optional[Executor] = None, max_workers: int = 2):
+        self.max_cached = max_cached
+        self.executor = executor
+        self.max_workers = max_workers
+        self.cache: OrderedDict[HandKey, bytes] = OrderedDict()
+        self.pending: Dict[HandKey, asyncio.Future] = {}
+
+    def is_available(self) -> bool:
+        return Image is not None
+
+    def get_executor(self) -> Executor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self.executor
+
+    async def render(self, cards: Iterable[Card]) -> Optional[bytes]:
+        if not self.is_available():
+            return None
+
+        hand_key = get_hand_key(cards)
+        if not hand_key:
+            return None
+
+        image = self.cache.get(hand_key)
+        if image is not None:
+            self.cache.move_to_end(hand_key)
+            return image
+
+        # Sama käe samaaegsed päringud ootavad sama tulemust
+        pending = self.pending.get(hand_key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.get_executor(), render_hand_image, hand_key)
+        self.pending[hand_key] = future
+        try:
+            image = await asyncio.shield(future)
+        finally:
+            del self.pending[hand_key]
+
+        self.cache[hand_key] = image
+        if len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+        return image
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+hand_images = HandImageRenderer()
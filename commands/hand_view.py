@@ -0,0 +1,120 @@
+from typing import Dict, List, Optional, Tuple
+
+from discord import ButtonStyle
+from discord.ui import Button, View
+
+from application.cards import CARDS, MAX_CARDS, iter_mask
+from common.types import Card
+
+# Discord lubab sõnumis 5 rida 5 nupuga; neli rida on kaartidele, viimane lehitsemiseks
+CARDS_PER_PAGE = 20
+MAX_PAGES = (MAX_CARDS + CARDS_PER_PAGE - 1) // CARDS_PER_PAGE
+
+HandKey = Tuple[int, Optional[tuple], bool]  # hand version, top card, is current player
+
+
+def get_card_label(card: Card) -> str:
+    color_emoji = get_color_emoji(card.color)
+    return f"{color_emoji}{card.face}"
+
+
+def get_color_emoji(color: str) -> str:
+    if color == "Wild":
+        return "⚫"
+    elif color == "Red":
+        return "🔴"
+    elif color == "Green":
+        return "🟢"
+    elif color == "Blue":
+        return "🔵"
+    elif color == "Yellow":
+        return "🟡"
+    else:
+        raise ValueError("Unknown color")
+
+
+class HandPage:
+    __slots__ = ("key", "index", "count", "cards", "view")
+
+    def __init__(self, key: tuple, index: int, count: int, cards: List[Card], view: View):
+        self.key = key
+        self.index = index
+        self.count = count
+        self.cards = cards
+        self.view = view
+
+    def get_content(self) -> str:
+        if self.count == 1:
+            return "Here are your cards:"
+        return f"Here are your cards (page {self.index + 1}/{self.count}):"
+
+
+def build_page_view(cards: List[Card], playable: List[bool], index: int, count: int, is_current: bool) -> View:
+    view = View()
+    for card, can_play in zip(cards, playable):
+        view.add_item(Button(
+            label=get_card_label(card),
+            style=ButtonStyle.secondary,
+            custom_id=f"card-{card.id}",
+            disabled=not is_current or not can_play
+        ))
+
+    # Lehitsemisnupud on alati viimases reas, et kaardinupud ei nihkuks
+    if count > 1:
+        view.add_item(Button(label="◀", style=ButtonStyle.primary, custom_id=f"hand-{max(index - 1, 0)}",
+                             disabled=index == 0, row=4))
+        view.add_item(Button(label="▶", style=ButtonStyle.primary, custom_id=f"hand-{min(index + 1, count - 1)}",
+                             disabled=index == count - 1, row=4))
+    view.add_item(Button(label="Draw Card", style=ButtonStyle.danger, custom_id="draw-card-btn",
+                         disabled=not is_current, row=4))
+    return view
+
+
+class HandViews:
+    """Built hand pages per player.
+
+    A player's pages are reused as long as (hand version, top card, is current
+    player) is unchanged. When it changes, each page is compared by its own
+    key and only the pages whose buttons differ are built again.
+    """
+
+    def __init__(self):
+        self.hands: Dict[int, Tuple[HandKey, List[HandPage]]] = {}
+        self.built = 0
+        self.reused = 0
+
+    def get_pages(self, player, top_card: Optional[Card], playable_mask: int, is_current: bool) -> List[HandPage]:
+        top_card_key = (top_card.id, top_card.color) if top_card else None
+        hand_key = (player.hand_version, top_card_key, is_current)
+        cached = self.hands.get(player.id)
+        if cached is not None and cached[0] == hand_key:
+            return cached[1]
+
+        # Kaardid on käe järjekorras: võetud kaart muudab ainult viimast lehte
+        cards = [CARDS[card_id] for card_id in player.hand]
+        # Kui pole mängija kord, on kõik nupud keelatud ja pealmine kaart lehti ei muuda
+        playable_ids = set(iter_mask(playable_mask)) if is_current else set()
+        count = max(1, (len(cards) + CARDS_PER_PAGE - 1) // CARDS_PER_PAGE)
+        old_pages = cached[1] if cached is not None else []
+
+        pages = []
+        for index in range(count):
+            page_cards = cards[index * CARDS_PER_PAGE:(index + 1) * CARDS_PER_PAGE]
+            playable = [card.id in playable_ids for card in page_cards]
+            key = (tuple(card.id for card in page_cards), tuple(playable), count, is_current)
+            if index < len(old_pages) and old_pages[index].key == key:
+                pages.append(old_pages[index])
+                self.reused += 1
+                continue
+            view = build_page_view(page_cards, playable, index, count, is_current)
+            pages.append(HandPage(key, index, count, page_cards, view))
+            self.built += 1
+
+        self.hands[player.id] = (hand_key, pages)
+        return pages
+
+    def discard(self, player_id: int) -> None:
+        self.hands.pop(player_id, None)
+
+    def clear(self) -> None:
+        self.hands.clear()
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+import discord
+
+from commands.outbound import outbound
+
+Payload = Dict[str, Any]
+
+
+def get_payload_key(payload: Payload) -> tuple:
+    key = []
+    for name, value in sorted(payload.items(), key=lambda item: item[0]):
+        if isinstance(value, discord.Embed):
+            value = repr(sorted(value.to_dict().items()))
+        elif name == "attachments":
+            value = tuple(getattr(attachment, "filename", None) for attachment in value)
+        elif isinstance(value, discord.ui.View):
+            value = id(value)
+        key.append((name, value))
+    return tuple(key)
+
+
+class MessageEditor:
+    """Coalesces edits of one message.
+
+    request() only records what should change. At most one edit is sent per
+    `interval`; it carries everything requested since the last one and is
+    rendered from the latest state at send time. Edits that would send the
+    same payload as the previous one are skipped.
+    """
+
+    def __init__(self, message: discord.Message, interval: float = 1.0):
+        self.message = message
+        self.interval = interval
+        self.pending: Payload = {}
+        self.render: Optional[Callable[[], Payload]] = None
+        self.last_key: Optional[tuple] = None
+        self.last_sent_at = float("-inf")
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.skipped = 0
+
+    def request(self, render: Optional[Callable[[], Payload]] = None, **kwargs) -> None:
+        if render is not None:
+            self.render = render
+        self.pending.update(kwargs)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    def has_pending(self) -> bool:
+        return self.render is not None or bool(self.pending)
+
+    def take_payload(self) -> Payload:
+        payload = self.render() if self.render is not None else {}
+        payload.update(self.pending)
+        self.render = None
+        self.pending = {}
+        return payload
+
+    async def run(self) -> None:
+        while self.has_pending():
+            delay = self.last_sent_at + self.interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.send(self.take_payload())
+
+    async def send(self, payload: Payload) -> None:
+        key = get_payload_key(payload)
+        if key == self.last_key:
+            self.skipped += 1
+            return
+
+        # Ajakava ootab rate limiti ära ja proovib uuesti
+        await outbound.call(f"edit:{self.message.channel.id}", lambda: self.message.edit(**payload))
+
+        self.last_key = key
+        self.last_sent_at = time.monotonic()
+        self.sent += 1
+
+    def cancel(self) -> None:
+        self.render = None
+        self.pending = {}
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def flush(self) -> None:
+        """Sends whatever is pending right away."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        if self.has_pending():
+            await self.send(self.take_payload())
+
+    async def replace(self, **kwargs) -> None:
+        """Drops pending edits and sends this one right away, e.g. the final winner message."""
+        self.cancel()
+        await self.send(kwargs)
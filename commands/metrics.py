@@ -0,0 +1,249 @@
+"""In-process metrics served in the Prometheus text format.
+
+Recording is a dict lookup and a few additions, so it can sit on every
+handler and every Discord request. Gauges that are cheap to compute from
+existing state (running games, players) are read only when scraped.
+"""
+import asyncio
+import functools
+import re
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import aiohttp
+from aiohttp import web
+
+from commands.tracing import tracer
+
+Labels = Tuple[str, ...]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Sekundites: Discordi päringud võtavad ~50-500 ms, mänguloogika mikrosekundeid
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def format_labels(label_names: Tuple[str, ...], labels: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(label_names, labels)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = (),
+                 collect: Optional[Callable[[], Union[float, Dict[Labels, float]]]] = None):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.values: Dict[Labels, float] = {}
+        self.collect = collect  # Kui antud, loetakse väärtus (või {sildid: väärtus}) alles päringu ajal
+
+    def set(self, value: float, *labels: str) -> None:
+        self.values[labels] = value
+
+    def render(self) -> List[str]:
+        if self.collect is not None:
+            value = self.collect()
+            self.values = value if isinstance(value, dict) else {(): value}
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)  # viimane on +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self.series: Dict[Labels, HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = HistogramSeries(len(self.buckets))
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series.counts):
+                cumulative += count
+                le = format_labels(self.label_names, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_text = format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {series.sum}")
+            lines.append(f"{self.name}_count{label_text} {series.count}")
+        return lines
+
+
+# Discordi REST päringud nimetatakse discord.py meetodite järgi, millega neid tehakse
+DISCORD_CALLS = [
+    ("POST", re.compile(r"/interactions/\d+/[^/]+/callback$"), "interaction.response"),
+    ("PATCH", re.compile(r"/channels/\d+/messages/\d+$"), "message.edit"),
+    ("DELETE", re.compile(r"/channels/\d+/messages/\d+$"), "message.delete"),
+    ("POST", re.compile(r"/channels/\d+/messages$"), "channel.send"),
+    ("POST", re.compile(r"/channels/\d+/messages/bulk-delete$"), "channel.delete_messages"),
+    ("DELETE", re.compile(r"/webhooks/\d+/[^/]+/messages/@original$"), "delete_original_response"),
+    ("PATCH", re.compile(r"/webhooks/\d+/[^/]+/messages/@original$"), "edit_original_response"),
+    ("POST", re.compile(r"/webhooks/\d+/[^/]+$"), "followup.send"),
+    ("DELETE", re.compile(r"/webhooks/\d+/[^/]+/messages/\d+$"), "followup.delete"),
+]
+
+
+def get_discord_call(method: str, path: str) -> str:
+    for call_method, pattern, name in DISCORD_CALLS:
+        if method == call_method and pattern.search(path):
+            return name
+    return "other"
+
+
+class Metrics:
+    def __init__(self):
+        self.handler_seconds = Histogram("uno_handler_seconds", "Time spent in GameUI handlers.", ("handler",))
+        self.handler_exceptions = Counter("uno_handler_exceptions_total", "Handlers that raised.",
+                                          ("handler", "exception"))
+        # Nupu marsruudi järgi ("card-*", "join-btn"); handler_seconds on handleri funktsiooni järgi
+        self.route_seconds = Histogram("uno_route_seconds", "Time to apply a component interaction, by route.",
+                                       ("route",))
+        self.route_exceptions = Counter("uno_route_exceptions_total", "Component interactions that raised, by route.",
+                                        ("route", "exception"))
+        self.discord_seconds = Histogram("uno_discord_request_seconds", "Discord REST request latency.",
+                                         ("call", "status"))
+        self.game_errors = Counter("uno_game_errors_total", "Actions rejected by GameLogic.", ("reason",))
+        self.loop_lag_seconds = Histogram("uno_event_loop_lag_seconds", "Event loop scheduling delay.")
+        self.active_games = Gauge("uno_active_games", "Games and lobbies in memory.")
+        self.active_players = Gauge("uno_active_players", "Players in games and lobbies in memory.")
+        self.games_evicted = Counter("uno_games_evicted_total", "Idle games spilled to the store or closed.",
+                                     ("action",))
+        self.outbound_queue_depth = Gauge("uno_outbound_queue_depth", "Discord requests waiting to be sent.",
+                                          ("priority",))
+        self.outbound_wait_seconds = Histogram("uno_outbound_wait_seconds",
+                                               "Time Discord requests waited in the outbound queue.", ("priority",))
+        self.outbound_rate_limited = Counter("uno_outbound_rate_limited_total",
+                                             "Discord requests that hit a rate limit and were retried.", ("route",))
+        self.lag_task: Optional[asyncio.Task] = None
+        self.runner: Optional[web.AppRunner] = None
+
+    def get_all(self) -> list:
+        return [self.handler_seconds, self.handler_exceptions, self.route_seconds, self.route_exceptions,
+                self.discord_seconds, self.game_errors, self.loop_lag_seconds, self.active_games, self.active_players,
+                self.games_evicted, self.outbound_queue_depth, self.outbound_wait_seconds, self.outbound_rate_limited]
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.get_all():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def handler(self, func):
+        """Times an async handler, counts the exceptions it raises and traces it as a span."""
+        name = func.__name__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                with tracer.span(name):
+                    return await func(*args, **kwargs)
+            except Exception as error:
+                self.handler_exceptions.inc(name, type(error).__name__)
+                raise
+            finally:
+                self.handler_seconds.observe(time.perf_counter() - start, name)
+
+        return wrapper
+
+    def count_game_error(self, result: dict) -> None:
+        self.game_errors.inc(result["error"])
+
+    def create_http_trace(self) -> aiohttp.TraceConfig:
+        """Trace config for discord.Client(http_trace=...), times every Discord REST request."""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.start = time.perf_counter_ns()
+
+        def record(context, params, status: str) -> None:
+            call = get_discord_call(params.method, params.url.path)
+            duration = time.perf_counter_ns() - context.start
+            self.discord_seconds.observe(duration / 1e9, call, status)
+            tracer.add(f"discord.{call}", context.start, duration, {"status": status})
+
+        async def on_request_end(session, context, params):
+            record(context, params, str(params.response.status))
+
+        async def on_request_exception(session, context, params):
+            record(context, params, type(params.exception).__name__)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        return trace
+
+    async def measure_loop_lag(self, interval: float = 0.5) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            self.loop_lag_seconds.observe(max(0.0, loop.time() - expected))
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=self.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def start(self, port: int, host: str = "127.0.0.1") -> None:
+        if self.runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, host, port).start()
+        self.lag_task = asyncio.get_running_loop().create_task(self.measure_loop_lag())
+
+    async def stop(self) -> None:
+        if self.lag_task is not None:
+            self.lag_task.cancel()
+            self.lag_task = None
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+metrics = Metrics()
@@ -0,0 +1,245 @@
+"""Outbound Discord requests, ordered by priority and per-route rate limits.
+
+Replies, game message edits and deletes all go through one scheduler.
+Every request names its route bucket ("kind:id") and a priority class. The
+scheduler sends the most urgent request whose bucket has room, one request
+per route at a time so Discord sees them in order and at most
+`max_concurrency` in total. Turn responses therefore never wait behind
+cleanup deletes. Queued deletes of channel messages go out as one bulk
+delete where Discord allows it.
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import discord
+
+from commands.metrics import metrics
+
+Request = Callable[[], Awaitable]
+
+TURN = 0  # Vastused ja mängusõnumi muudatused, mida mängijad ootavad
+CLEANUP = 1  # Vanade vastuste kustutamine, võib oodata
+PRIORITY_NAMES = ("turn", "cleanup")
+
+MAX_BULK_DELETE = 100
+
+
+def get_route_kind(route: str) -> str:
+    return route.partition(":")[0]
+
+
+class Bucket:
+    """Sliding window of `limit` requests per `per` seconds for one route."""
+
+    __slots__ = ("limit", "per", "sent", "blocked_until")
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.sent: Deque[float] = deque()
+        self.blocked_until = 0.0
+
+    def get_delay(self, now: float) -> float:
+        while self.sent and self.sent[0] <= now - self.per:
+            self.sent.popleft()
+        delay = self.blocked_until - now
+        if len(self.sent) >= self.limit:
+            delay = max(delay, self.sent[0] + self.per - now)
+        return max(0.0, delay)
+
+    def is_idle(self, now: float) -> bool:
+        return self.get_delay(now) == 0 and not self.sent
+
+
+class OutboundRequest:
+    __slots__ = ("route", "request", "priority", "future", "queued_at", "message")
+
+    def __init__(self, route: str, request: Request, priority: int, future: asyncio.Future,
+                 message: Optional[discord.abc.Snowflake] = None):
+        self.route = route
+        self.request = request
+        self.priority = priority
+        self.future = future
+        self.queued_at = time.monotonic()
+        self.message = message  # Ainult kanalisõnumite kustutamisel, mida saab hulgi kustutada
+
+
+class BulkDeleteFailed(Exception):
+    pass
+
+
+class OutboundScheduler:
+    def __init__(self, max_concurrency: int = 50, limit: int = 5, per: float = 5.0):
+        self.max_concurrency = max_concurrency
+        self.limits: Dict[str, Tuple[int, float]] = {}  # route kind -> (limit, per)
+        self.default_limit = (limit, per)
+        self.queues: List["OrderedDict[str, Deque[OutboundRequest]]"] = [OrderedDict() for _ in PRIORITY_NAMES]
+        self.depths = [0] * len(PRIORITY_NAMES)
+        self.buckets: Dict[str, Bucket] = {}
+        self.no_bulk_delete: set = set()  # Kanalid, kus hulgi kustutamiseks pole õigust
+        self.in_flight = 0
+        self.busy_routes: set = set()
+        self.task: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+
+    def set_limit(self, kind: str, limit: int, per: float) -> None:
+        self.limits[kind] = (limit, per)
+
+    def get_bucket(self, route: str) -> Bucket:
+        bucket = self.buckets.get(route)
+        if bucket is None:
+            bucket = self.buckets[route] = Bucket(*self.limits.get(get_route_kind(route), self.default_limit))
+        return bucket
+
+    def get_queue_depth(self) -> Dict[str, int]:
+        return dict(zip(PRIORITY_NAMES, self.depths))
+
+    def submit(self, route: str, request: Request, priority: int = TURN,
+               message: Optional[discord.abc.Snowflake] = None) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.enqueue(OutboundRequest(route, request, priority, future, message))
+        return future
+
+    async def call(self, route: str, request: Request, priority: int = TURN):
+        return await self.submit(route, request, priority)
+
+    def delete(self, message, route: Optional[str] = None, priority: int = CLEANUP) -> asyncio.Future:
+        """Deletes a message; a message that is already gone counts as deleted.
+
+        Without a route the message is deleted through its channel and may be
+        batched with other queued deletes there. Ephemeral replies can only be
+        deleted through their interaction, so they pass its route.
+        """
+        async def delete():
+            try:
+                await message.delete()
+            except discord.HTTPException:
+                pass  # Sõnum on juba kustutatud või interaktsioon aegunud
+
+        channel = message.channel
+        can_bulk = (route is None and hasattr(channel, "delete_messages")
+                    and channel.id not in self.no_bulk_delete)
+        route = route or f"delete:{channel.id}"
+        future = asyncio.get_running_loop().create_future()
+        self.enqueue(OutboundRequest(route, delete, priority, future, message if can_bulk else None))
+        return future
+
+    def enqueue(self, item: OutboundRequest, first: bool = False) -> None:
+        queue = self.queues[item.priority].get(item.route)
+        if queue is None:
+            queue = self.queues[item.priority][item.route] = deque()
+        if first:
+            queue.appendleft(item)
+        else:
+            queue.append(item)
+        self.depths[item.priority] += 1
+
+        if self.task is None or self.task.done():
+            self.wakeup = asyncio.Event()
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        else:
+            self.wakeup.set()
+
+    def take_batch(self, queue: Deque[OutboundRequest]) -> List[OutboundRequest]:
+        # Järjestikused kustutamised samas kanalis saadetakse ühe päringuga
+        batch = [queue.popleft()]
+        if batch[0].message is not None:
+            while queue and queue[0].message is not None and len(batch) < MAX_BULK_DELETE:
+                batch.append(queue.popleft())
+        return batch
+
+    def dispatch(self, now: float) -> Optional[float]:
+        """Starts every request that may go now; returns how long until the next one may."""
+        wait = None
+        for priority, routes in enumerate(self.queues):
+            for route in list(routes):
+                if self.in_flight >= self.max_concurrency:
+                    return wait
+                if route in self.busy_routes:
+                    continue
+                delay = self.get_bucket(route).get_delay(now)
+                if delay > 0:
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+
+                queue = routes[route]
+                batch = self.take_batch(queue)
+                self.depths[priority] -= len(batch)
+                batch = [item for item in batch if not item.future.done()]  # Ootaja võis loobuda
+                if queue:
+                    routes.move_to_end(route)  # Marsruudid vahelduvad, keegi ei jää nälga
+                else:
+                    del routes[route]
+                if batch:
+                    self.get_bucket(route).sent.append(now)
+                    self.in_flight += 1
+                    self.busy_routes.add(route)
+                    asyncio.get_running_loop().create_task(self.send(route, batch))
+        return wait
+
+    async def run(self) -> None:
+        while any(self.depths) or self.in_flight:
+            self.wakeup.clear()
+            wait = self.dispatch(time.monotonic())
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+            self.evict_buckets()
+
+    def evict_buckets(self) -> None:
+        if len(self.buckets) < 1000:
+            return
+        now = time.monotonic()
+        queued = {route for routes in self.queues for route in routes}
+        for route in [route for route, bucket in self.buckets.items() if route not in queued and bucket.is_idle(now)]:
+            del self.buckets[route]
+
+    async def send(self, route: str, batch: List[OutboundRequest]) -> None:
+        now = time.monotonic()
+        for item in batch:
+            metrics.outbound_wait_seconds.observe(now - item.queued_at, PRIORITY_NAMES[item.priority])
+        try:
+            if len(batch) > 1:
+                await self.bulk_delete(batch)
+                result = None
+            else:
+                result = await batch[0].request()
+        except discord.RateLimited as error:
+            # Discord ütles, kui kaua oodata; sama marsruudi päringud ootavad seni
+            metrics.outbound_rate_limited.inc(get_route_kind(route))
+            self.get_bucket(route).blocked_until = time.monotonic() + error.retry_after
+            for item in reversed(batch):
+                self.enqueue(item, first=True)
+        except BulkDeleteFailed:
+            for item in reversed(batch):
+                item.message = None  # Kustutame ükshaaval
+                self.enqueue(item, first=True)
+        except Exception as error:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(error)
+        else:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_result(result)
+        finally:
+            self.in_flight -= 1
+            self.busy_routes.discard(route)
+            if self.wakeup is not None:
+                self.wakeup.set()
+
+    async def bulk_delete(self, batch: List[OutboundRequest]) -> None:
+        channel = batch[0].message.channel
+        try:
+            await channel.delete_messages([item.message for item in batch])
+        except discord.HTTPException as error:
+            # Õigus puudub, mõni sõnum on juba kadunud või liiga vana: kustutame ükshaaval
+            if isinstance(error, discord.Forbidden):
+                self.no_bulk_delete.add(channel.id)
+            raise BulkDeleteFailed() from error
+
+
+outbound = OutboundScheduler()
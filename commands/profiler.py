@@ -0,0 +1,72 @@
+"""Opt-in sampling profiler for the bot's event loop thread.
+
+A daemon thread looks at the loop thread's stack every `interval` seconds
+and counts each distinct stack. The result is written in the folded format
+("outer;inner;leaf count" per line) that flamegraph.pl and speedscope read.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+
+def get_frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+def get_folded_stack(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(get_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+        self.target_thread_id: Optional[int] = None
+        self.started_at = 0.0
+
+    def is_running(self) -> bool:
+        return self.thread is not None
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+        self.samples.clear()
+        self.stopping.clear()
+        self.target_thread_id = threading.get_ident()  # Kutsutakse event loopi lõimest
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self.run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        while not self.stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.target_thread_id)
+            if frame is not None:
+                self.samples[get_folded_stack(frame)] += 1
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+
+    def write_folded(self, path: str) -> int:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+        return sum(self.samples.values())
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,89 @@
+"""Per-interaction trace spans in the Chrome trace event format.
+
+Every interaction gets a trace id in a contextvar, so spans opened anywhere
+below it - handlers, GameLogic calls, embed building, Discord requests -
+land on the same row when the export is opened in chrome://tracing or
+Perfetto. Spans are only recorded while tracing is enabled.
+"""
+import functools
+import inspect
+import itertools
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+current_trace: ContextVar[int] = ContextVar("current_trace", default=0)  # 0 = taustatöö
+
+
+class Tracer:
+    def __init__(self, max_events: int = 100000):
+        self.enabled = False
+        self.events: deque = deque(maxlen=max_events)  # (nimi, algus ns, kestus ns, trace id, args)
+        self.trace_ids = itertools.count(1)
+
+    def add(self, name: str, start_ns: int, duration_ns: int, args: Optional[dict] = None) -> None:
+        if self.enabled:
+            self.events.append((name, start_ns, duration_ns, current_trace.get(), args))
+
+    @contextmanager
+    def span(self, name: str, **args):
+        if not self.enabled:
+            yield
+            return
+        # Väljaspool interaktsiooni avatud span alustab oma tracei
+        token = current_trace.set(next(self.trace_ids)) if not current_trace.get() else None
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter_ns() - start, args or None)
+            if token is not None:
+                current_trace.reset(token)
+
+    @contextmanager
+    def trace(self, name: str, **args):
+        """Starts a new trace for one interaction; spans inside it share its id."""
+        token = current_trace.set(next(self.trace_ids))
+        try:
+            with self.span(name, **args):
+                yield
+        finally:
+            current_trace.reset(token)
+
+    def traced(self, func):
+        name = func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with self.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def get_trace_events(self) -> list:
+        pid = os.getpid()
+        return [
+            {"name": name, "ph": "X", "ts": start / 1000, "dur": duration / 1000, "pid": pid, "tid": trace_id,
+             **({"args": args} if args else {})}
+            for name, start, duration, trace_id, args in self.events
+        ]
+
+    def export(self, path: str) -> int:
+        events = self.get_trace_events()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+        self.events.clear()
+        return len(events)
+
+
+tracer = Tracer()
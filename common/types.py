@@ -1,8 +1,26 @@
-from dataclasses import dataclass
-from typing import List, Literal
+import itertools
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from application.deck import Deck
+
+
+def get_card_mask(card_ids: Iterable[int]) -> int:
+    # Bitt nr N on püsti, kui kaart id-ga N on olemas
+    mask = 0
+    for card_id in card_ids:
+        mask |= 1 << card_id
+    return mask
+
+
+# Iga käe muutus saab uue numbri; kõigi mängijate peale unikaalne, et vahemälu võtmed ei kattuks
+_hand_versions = itertools.count(1)
 
 
 class Card:
+    # Kaardid on tabelis (application/cards.py) ainult üks kord, mängus liiguvad ringi nende id-d
+    __slots__ = ("color", "face", "id")
+
     def __init__(self, color: str, face: str, id: int):
         self.color = color
         self.face = face
@@ -13,22 +31,90 @@ class Card:
 
 
 class Player:
-    def __init__(self, id: str, hand: list[Card], has_played_card: bool = False, has_said_uno: bool = False):
+    """One player's seat. Never changed in place: every change returns a new Player."""
+
+    __slots__ = ("id", "hand", "hand_mask", "hand_version", "has_played_card", "has_said_uno")
+
+    def __init__(self, id: int, hand: Optional[bytes] = None, has_played_card: bool = False, has_said_uno: bool = False):
         self.id = id
-        self.hand = hand  # List of Card objects
+        self.hand = bytes(hand) if hand is not None else b""  # card ids
+        self.hand_mask = get_card_mask(self.hand)
+        self.hand_version = next(_hand_versions)
         self.has_played_card = has_played_card
         self.has_said_uno = has_said_uno
 
+    def replace(self, has_played_card: Optional[bool] = None, has_said_uno: Optional[bool] = None) -> "Player":
+        player = Player.__new__(Player)
+        player.id = self.id
+        player.hand = self.hand
+        player.hand_mask = self.hand_mask
+        player.hand_version = self.hand_version
+        player.has_played_card = self.has_played_card if has_played_card is None else has_played_card
+        player.has_said_uno = self.has_said_uno if has_said_uno is None else has_said_uno
+        return player
+
+    def with_hand(self, hand: bytes, hand_mask: int) -> "Player":
+        player = self.replace()
+        player.hand = hand
+        player.hand_mask = hand_mask
+        player.hand_version = next(_hand_versions)
+        return player
+
+    def set_hand(self, hand) -> "Player":
+        hand = bytes(hand)
+        return self.with_hand(hand, get_card_mask(hand))
+
+    def add_cards(self, card_ids) -> "Player":
+        return self.with_hand(self.hand + bytes(card_ids), self.hand_mask | get_card_mask(card_ids))
+
+    def add_card(self, card_id: int) -> "Player":
+        return self.with_hand(self.hand + bytes((card_id,)), self.hand_mask | 1 << card_id)
+
+    def remove_card(self, card_id: int) -> "Player":
+        index = self.hand.index(card_id)
+        return self.with_hand(self.hand[:index] + self.hand[index + 1:], self.hand_mask & ~(1 << card_id))
+
     def __repr__(self):
         return f"Player(ID: {self.id}, Cards: {len(self.hand)}, Has Played: {self.has_played_card}, Has Said Uno: {self.has_said_uno})"
 
 class GameState:
-    def __init__(self, current_player_index: int, deck: list[Card], discard: list[Card], is_reversed: bool, players: list[Player]):
+    """State of one game. Never changed in place: application.transitions builds a new
+    GameState for every action and shares all unchanged parts with the old one."""
+
+    __slots__ = ("current_player_index", "deck", "is_reversed", "players", "wild_color", "cheat_counts", "seed",
+                 "rng", "bulk_rng", "seats")
+
+    def __init__(self, current_player_index: int, deck: "Deck", is_reversed: bool, players: Iterable[Player],
+                 wild_color: Optional[str] = None, cheat_counts: Optional[Dict[str, int]] = None,
+                 seed: Optional[int] = None, rng: Optional[bytes] = None, bulk_rng: Optional[bytes] = None):
         self.current_player_index = current_player_index
-        self.deck = deck  # List of Card objects
-        self.discard = discard  # List of Card objects
+        self.deck = deck  # application.deck.Deck - draw pile and discard pile
         self.is_reversed = is_reversed
-        self.players = players  # List of Player objects
+        self.players: Tuple[Player, ...] = tuple(players)
+        self.wild_color = wild_color  # Color chosen for the Wild card on top of the discard pile
+        self.cheat_counts = cheat_counts if cheat_counts is not None else {}
+        self.seed = seed  # Seed of the game's random generators, replays the game exactly
+        # Generaatorite olekud on pakitud baitidena (application.state_codec), Pythoni täisarvudena oleks
+        # Mersenne Twisteri olek iga mängu kohta ~24 KB
+        self.rng = rng  # random.Random state of the deck shuffles, None when the deck is shuffled with NumPy
+        self.bulk_rng = bulk_rng  # NumPy bit generator state, when the deck is shuffled with NumPy
+        self.seats: Dict[int, int] = {player.id: seat for seat, player in enumerate(self.players)}
+
+    def replace(self, **changes) -> "GameState":
+        state = GameState.__new__(GameState)
+        state.current_player_index = self.current_player_index
+        state.deck = self.deck
+        state.is_reversed = self.is_reversed
+        state.players = self.players
+        state.wild_color = self.wild_color
+        state.cheat_counts = self.cheat_counts
+        state.seed = self.seed
+        state.rng = self.rng
+        state.bulk_rng = self.bulk_rng
+        state.seats = self.seats  # Istekohad ei muutu mängu jooksul
+        for name, value in changes.items():
+            setattr(state, name, value)
+        return state
 
     def __repr__(self):
-        return f"GameState(Current Player Index: {self.current_player_index}, Players: {len(self.players)}, Deck Size: {len(self.deck)}, Discard Size: {len(self.discard)}, Is Reversed: {self.is_reversed})"
\ No newline at end of file
+        return f"GameState(Current Player Index: {self.current_player_index}, Players: {len(self.players)}, Deck Size: {self.deck.draw_size}, Discard Size: {self.deck.discard_size}, Is Reversed: {self.is_reversed})"